@@ -1,57 +1,425 @@
-import os
+import asyncio
 import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from email.utils import parsedate_to_datetime
+
 import requests
+from requests.adapters import HTTPAdapter
 
 from dotenv import load_dotenv
 
+from dishExtractor import extract_dishes
+from dishParser import DishLineParser, format_dishes, parse_dish_names
+from llmBackends import backend_from_env, fallback_from_env
+from llmResilience import CircuitOpenError, LatencyHistogram
+from rateLimiter import BACKFILL, INTERACTIVE, RateLimitTimeout, estimate_tokens
+from responseCache import ResponseCache, cache_key
+
 # Groq API Key
 load_dotenv()
 
-API_KEY = os.getenv("API_KEY")
-BASE_URL = "https://api.groq.com/openai/v1/chat/completions"
+# Keičiant build_prompt() padidinti, kad nebūtų grąžinami seno prompt'o atsakymai iš talpyklos
+PROMPT_VERSION = 1
+# Paprasti sakiniai ("valgiau cepelinus") atpažįstami vietoje, be API kvietimo
+USE_LOCAL_EXTRACTOR = os.getenv("LLM_LOCAL_EXTRACTOR", "1") != "0"
+CACHE_FILE = os.getenv("LLM_CACHE_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "llm_cache.db"))
+
+# HTTP nustatymai (sekundėmis)
+CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("LLM_READ_TIMEOUT", "30"))
+MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 8.0
+POOL_SIZE = 10
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Ilgiau nei tiek nurodžius Retry-After nelaukiama - grąžinama klaida
+MAX_RETRY_AFTER = float(os.getenv("LLM_MAX_RETRY_AFTER", "60"))
+# Visas vienos užklausos laikas su pakartojimais, kai siunčiama asinchroniškai
+REQUEST_TIMEOUT = float(os.getenv("LLM_REQUEST_TIMEOUT", "60"))
+DEFAULT_CONCURRENCY = POOL_SIZE
+# call_llama_api: bendras laikas su pakartojimais; po p95 (bet ne anksčiau kaip HEDGE_MIN_DELAY)
+# siunčiama antra tokia pati užklausa ir imamas pirmas atsakymas
+REQUEST_DEADLINE = float(os.getenv("LLM_DEADLINE", "20"))
+# call_llama_api_batch: bendras laikas su pakartojimais; atsakymas ilgesnis nei vieno teksto
+BATCH_DEADLINE = float(os.getenv("LLM_BATCH_DEADLINE", "60"))
+HEDGE_PERCENTILE = 0.95
+HEDGE_MIN_SAMPLES = 20
+HEDGE_MIN_DELAY = 0.5
+# Gijos bandymams: pagrindiniam ir dubliuojančiam kiekvieno lygiagretaus kvietimo bandymui
+HEDGE_WORKERS = int(os.getenv("LLM_HEDGE_WORKERS", "64"))
+MAX_TOKENS = 300
+# Paketinėse užklausose: tekstų skaičius vienoje užklausoje ir atsakymo tokenai vienam tekstui
+BATCH_SIZE = 20
+BATCH_TOKENS_PER_QUERY = 150
+
+_session = None
+_response_cache = None
+_backend = None
+_UNSET = object()
+_fallback_backend = _UNSET
+_hedge_executor = None
+
+# Sėkmingų call_llama_api ir srautinių užklausų trukmės; pagal jas parenkamas dubliavimo laikas
+latency_histogram = LatencyHistogram()
+# Srautinių užklausų laikas iki pirmo tokeno
+first_token_histogram = LatencyHistogram()
+
+
+def get_session():
+    # Vienas Session visam moduliui: keep-alive, todėl TCP/TLS jungtis nekuriama kiekvienam kvietimui
+    global _session
+    if _session is None:
+        session = requests.Session()
+        # Du serveriai: pagrindinis ir atsarginis
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=POOL_SIZE)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        _session = session
+    return _session
+
+
+def get_backend():
+    # Groq pagal nutylėjimą; kitas serveris - per LLM_BACKEND arba set_backend()
+    global _backend
+    if _backend is None:
+        _backend = backend_from_env()
+    return _backend
+
+
+def set_backend(backend):
+    global _backend
+    _backend = backend
+
+
+def get_fallback_backend():
+    global _fallback_backend
+    if _fallback_backend is _UNSET:
+        _fallback_backend = fallback_from_env()
+    return _fallback_backend
+
+
+def set_fallback_backend(backend):
+    global _fallback_backend
+    _fallback_backend = backend
+
+
+def _available_backend():
+    # Atjungtos grandinės serveris praleidžiamas; jei nėra ir atsarginio - iškart klaida
+    for backend in (get_backend(), get_fallback_backend()):
+        if backend is not None and backend.breaker.allow():
+            return backend
+    raise CircuitOpenError("LLM serveris laikinai nepasiekiamas, bandykite vėliau")
+
+
+def resilience_stats():
+    backend, fallback = get_backend(), get_fallback_backend()
+    return {
+        "latency": latency_histogram.snapshot(),
+        "first_token": first_token_histogram.snapshot(),
+        "breaker": backend.breaker.stats(),
+        "fallback_breaker": fallback.breaker.stats() if fallback is not None else None,
+    }
+
+
+def get_response_cache():
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache(CACHE_FILE)
+    return _response_cache
+
+
+def retry_delay(attempt, response=None):
+    # Retry-After (sekundės arba HTTP data), kitaip eksponentinis laukimas su atsitiktiniu jitter
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def post_with_retries(url, payload, headers, stream=False, limiter=None, priority=INTERACTIVE, deadline=None):
+    # limiter - bendras rateLimiter.RateLimiter: kiekvienas bandymas laukia leidimo pagal priority.
+    # deadline - time.monotonic() riba: po jos nebekartojama ir nelaukiama
+    session = get_session()
+    tokens = estimate_tokens(payload)
+    for attempt in range(MAX_RETRIES + 1):
+        read_timeout = READ_TIMEOUT
+        if deadline is not None:
+            left = deadline - time.monotonic()
+            if left <= 0:
+                raise requests.exceptions.Timeout("Viršytas užklausos laikas")
+            read_timeout = min(READ_TIMEOUT, left)
+        if limiter is not None:
+            limiter.acquire(tokens, priority, timeout=read_timeout)
+        try:
+            response = session.post(url, headers=headers, json=payload, stream=stream,
+                                    timeout=(CONNECT_TIMEOUT, read_timeout), verify=False)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            delay = retry_delay(attempt)
+            if attempt == MAX_RETRIES or _past(deadline, delay):
+                raise
+            time.sleep(delay)
+            continue
+
+        if limiter is not None:
+            limiter.update_from_headers(response.headers)
+        if response.status_code in RETRY_STATUSES and attempt < MAX_RETRIES:
+            delay = retry_delay(attempt, response)
+            # Srautinis atsakymas laiko ryšį iš telkinio, kol neuždarytas
+            response.close()
+            if delay > MAX_RETRY_AFTER or _past(deadline, delay):
+                response.raise_for_status()
+            if limiter is not None and response.status_code == 429:
+                limiter.pause(delay)
+            time.sleep(delay)
+            continue
+
+        if not response.ok:
+            response.close()
+        response.raise_for_status()
+        return response
+
+
+def _past(deadline, delay):
+    return deadline is not None and time.monotonic() + delay >= deadline
+
+
+def build_prompt(query):
+    # Prompt for extracting food items.
+    return (
+        "Pavyzdys:\n"
+        "---EXAMPLE---\n"
+        "Šiandien vakare valgiau kebabą su česnakiniu padažu. Ryte, atsikėlęs valgiau cepelinus su kiauliena.\n"
+        "Atsakymas turėtų būti:\n"
+        "- Patiekalas: Kebabas su česnakiniu padažu\n"
+        "- Patiekalas: Cepelinai su kiauliena\n"
+        "---END EXAMPLE---\n\n"
+        "Patvarkyk rašybos klaidas, žodžių galūnes, kad būtų lietuviškos.\n"
+        "Išrink tik maisto produktus ir sudaryk patiekalus iš toliau pateikto teksto aprašymo, kuris pateikiamas lietuvių kalba. Jei nebuvo pateikta maisto patiekalų, neatsakyk į žinutę.\n"
+        "Surašykite juos atskirai nuorodų formatu:\n\n"
+        "---INPUT---\n"
+        f"{query}\n"
+        "---END INPUT---\n\n"
+        "Formatuokite atsakymą kaip:\n"
+        "- Patiekalas: [name]"
+    )
+
+
+def build_batch_prompt(queries):
+    # Keli tekstai vienoje užklausoje: instrukcija kartojama vieną kartą, atsakymas - JSON pagal indeksą
+    transcripts = "\n".join(f"[{index}] {query}" for index, query in enumerate(queries))
+    return (
+        "Pavyzdys:\n"
+        "---EXAMPLE---\n"
+        "[0] Šiandien vakare valgiau kebabą su česnakiniu padažu. Ryte, atsikėlęs valgiau cepelinus su kiauliena.\n"
+        "[1] Šiandien žiūrėjau filmą.\n"
+        "Atsakymas turėtų būti:\n"
+        '{"0": ["Kebabas su česnakiniu padažu", "Cepelinai su kiauliena"], "1": []}\n'
+        "---END EXAMPLE---\n\n"
+        "Patvarkyk rašybos klaidas, žodžių galūnes, kad būtų lietuviškos.\n"
+        "Kiekvienam toliau pateiktam tekstui lietuvių kalba išrink tik maisto produktus ir sudaryk patiekalus. "
+        "Jei tekste nebuvo maisto patiekalų, jo sąrašas tuščias.\n\n"
+        "---INPUT---\n"
+        f"{transcripts}\n"
+        "---END INPUT---\n\n"
+        "Atsakyk tik JSON objektu, kurio raktai - tekstų numeriai, o reikšmės - patiekalų sąrašai."
+    )
+
 
+def build_request(query, stream=False):
+    return _request_body(build_prompt(query), MAX_TOKENS, stream=stream)
 
-def call_llama_api(query):
+
+def _post(data, stream=False, priority=INTERACTIVE, deadline=None):
+    # Užklausa siunčiama tam modeliui, kurio backend'as atsakys; response.model - kad būtų žinoma, kas atsakė
+    backend = _available_backend()
+    data = dict(data, model=backend.model)
     try:
-        # Prompt for extracting food items.
-        prompt = (
-            "Pavyzdys:\n"
-            "---EXAMPLE---\n"
-            "Šiandien vakare valgiau kebabą su česnakiniu padažu. Ryte, atsikėlęs valgiau cepelinus su kiauliena.\n"
-            "Atsakymas turėtų būti:\n"
-            "- Patiekalas: Kebabas su česnakiniu padažu\n"
-            "- Patiekalas: Cepelinai su kiauliena\n"
-            "---END EXAMPLE---\n\n"
-            "Patvarkyk rašybos klaidas, žodžių galūnes, kad būtų lietuviškos.\n"
-            "Išrink tik maisto produktus ir sudaryk patiekalus iš toliau pateikto teksto aprašymo, kuris pateikiamas lietuvių kalba. Jei nebuvo pateikta maisto patiekalų, neatsakyk į žinutę.\n"
-            "Surašykite juos atskirai nuorodų formatu:\n\n"
-            "---INPUT---\n"
-            f"{query}\n"
-            "---END INPUT---\n\n"
-            "Formatuokite atsakymą kaip:\n"
-            "- Patiekalas: [name]"
-        )
-
-        headers = {
-            "Authorization": f"Bearer {API_KEY}",
-            "Content-Type": "application/json"
-        }
-
-        data = {
-            "model": "llama-3.3-70b-versatile",
-            "messages": [{"role": "user", "content": prompt}],
-            "temperature": 0.7,
-            "max_tokens": 300,
-            "top_p": 1
-        }
+        response = post_with_retries(backend.url, data, backend.headers(), stream, backend.rate_limiter,
+                                     priority, deadline)
+    except RateLimitTimeout:
+        # Vietinis ribojimas - ne serverio klaida, grandinės neatjungia, bet half-open bandymas atlaisvinamas
+        backend.breaker.release()
+        raise
+    except Exception:
+        backend.breaker.record(False)
+        raise
+    backend.breaker.record(True)
+    response.model = backend.model
+    return response
+
+
+def _get_hedge_executor():
+    global _hedge_executor
+    if _hedge_executor is None:
+        _hedge_executor = ThreadPoolExecutor(max_workers=HEDGE_WORKERS, thread_name_prefix="llm-hedge")
+    return _hedge_executor
+
+
+def hedge_delay():
+    # None - dar per mažai matavimų, kad būtų verta dubliuoti
+    if latency_histogram.count < HEDGE_MIN_SAMPLES:
+        return None
+    return max(HEDGE_MIN_DELAY, latency_histogram.percentile(HEDGE_PERCENTILE))
+
+
+def _hedged_post(data, priority, timeout):
+    # Pirmas sėkmingas iš (daugiausia) dviejų vienodų kvietimų; vėlesnis atsakymas tiesiog ignoruojamas
+    deadline = time.monotonic() + timeout
+    executor = _get_hedge_executor()
+    histogram = latency_histogram
+    started = []
+    primary_started = threading.Event()
+
+    def attempt():
+        attempt_start = time.monotonic()
+        started.append(attempt_start)
+        primary_started.set()
+        response = _post(data, priority=priority, deadline=deadline)
+        histogram.observe(time.monotonic() - attempt_start)
+        return response
+
+    delay = hedge_delay()
+    futures = {executor.submit(attempt)}
+    hedged = delay is None
+    # Dubliavimo laikas skaičiuojamas nuo tikrosios bandymo pradžios, ne nuo laukimo eilėje
+    if not primary_started.wait(max(0.0, deadline - time.monotonic())):
+        raise requests.exceptions.Timeout(f"Atsakymo nesulaukta per {timeout} s")
+    start = started[0]
+    error = None
+    while futures:
+        now = time.monotonic()
+        if now >= deadline:
+            raise requests.exceptions.Timeout(f"Atsakymo nesulaukta per {timeout} s")
+        wait_for = deadline - now
+        if not hedged:
+            wait_for = min(wait_for, max(0.0, start + delay - now))
+
+        done, futures = wait(futures, timeout=wait_for, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                return future.result()
+            error = future.exception()
+
+        if not hedged and futures and time.monotonic() >= start + delay:
+            futures.add(executor.submit(attempt))
+            hedged = True
+    raise error
+
+
+def _request_body(prompt, max_tokens, stream=False, json_output=False):
+    # "model" nustato _post pagal pasirinktą backend'ą
+    data = {
+        "messages": [{"role": "user", "content": prompt}],
+        "temperature": 0.7,
+        "max_tokens": max_tokens,
+        "top_p": 1
+    }
+    if stream:
+        data["stream"] = True
+    if json_output:
+        data["response_format"] = {"type": "json_object"}
+    return data
+
+
+def call_llama_api(query, priority=INTERACTIVE, timeout=REQUEST_DEADLINE):
+    try:
+        data = build_request(query)
 
         # Send API request
-        response = requests.post(BASE_URL, headers=headers, data=json.dumps(data), verify=False)
-        response.raise_for_status()
+        response = _hedged_post(data, priority, timeout)
 
         # Extract response text
         result = response.json().get("choices", [{}])[0].get("message", {}).get("content", "")
-        return {"text": result}
+        return {"text": result, "model": response.model}
+
+    except requests.exceptions.RequestException as e:
+        return {"error": f"Klaida jungiantis: {str(e)}"}
+    except Exception as e:
+        return {"error": f"Klaida, jungiantis prie API: {str(e)}"}
+
+
+def call_llama_api_batch(queries, priority=BACKFILL):
+    try:
+        data = _request_body(build_batch_prompt(queries), BATCH_TOKENS_PER_QUERY * len(queries), json_output=True)
+        response = _post(data, priority=priority, deadline=time.monotonic() + BATCH_DEADLINE)
+        result = response.json().get("choices", [{}])[0].get("message", {}).get("content", "")
+        return {"text": result, "model": response.model}
+
+    except requests.exceptions.RequestException as e:
+        return {"error": f"Klaida jungiantis: {str(e)}"}
+    except Exception as e:
+        return {"error": f"Klaida, jungiantis prie API: {str(e)}"}
+
+
+def parse_batch_response(content, count):
+    # Kiekvienas tekstas turi turėti savo sąrašą, kitaip visas atsakymas atmetamas
+    content = content.strip()
+    if content.startswith("```"):
+        content = content.strip("`").removeprefix("json").strip()
+    try:
+        result = json.loads(content)
+    except ValueError:
+        return None
+    if not isinstance(result, dict):
+        return None
+
+    dishes = []
+    for index in range(count):
+        items = result.get(str(index))
+        if not isinstance(items, list) or not all(isinstance(item, str) for item in items):
+            return None
+        dishes.append([item.strip() for item in items if item.strip()])
+    return dishes
+
+
+def iter_stream_content(response, deadline=None):
+    # Server-sent events: "data: {json}" eilutės su choices[0].delta.content, pabaiga - "data: [DONE]".
+    # deadline - time.monotonic() riba visam srautui, ne tik vienam skaitymui
+    response.encoding = "utf-8"
+    for line in response.iter_lines(decode_unicode=True):
+        if deadline is not None and time.monotonic() >= deadline:
+            raise requests.exceptions.Timeout("Viršytas užklausos laikas")
+        if not line or not line.startswith("data:"):
+            continue
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            return
+        content = json.loads(data).get("choices", [{}])[0].get("delta", {}).get("content")
+        if content:
+            yield content
+
+
+def stream_llama_api(query, on_dish):
+    # on_dish(name) kviečiamas kiekvienam patiekalui, kai tik ateina visa jo eilutė
+    parser = DishLineParser()
+    parts = []
+    try:
+        data = build_request(query, stream=True)
+        start = time.monotonic()
+        deadline = start + REQUEST_DEADLINE
+        with _post(data, stream=True, deadline=deadline) as response:
+            model = response.model
+            for content in iter_stream_content(response, deadline):
+                if not parts:
+                    first_token_histogram.observe(time.monotonic() - start)
+                parts.append(content)
+                for dish in parser.feed(content):
+                    on_dish(dish)
+        # Visas srautas prilygsta vienam call_llama_api atsakymui
+        latency_histogram.observe(time.monotonic() - start)
+        for dish in parser.close():
+            on_dish(dish)
+        return {"text": "".join(parts), "model": model}
 
     except requests.exceptions.RequestException as e:
         return {"error": f"Klaida jungiantis: {str(e)}"}
@@ -64,21 +432,172 @@ def process_response(response):
         return response["error"]
 
     result = response.get("text", "Negauta atsakymo")
+    dishes = parse_dish_names(result)
 
     # tikrinam ar tuscias ats ir nera maisto patiekalu
-    if not result.strip() or result.strip() == "None" or "Patiekalas:" not in result:
+    if not dishes:
         print("Klaida: transkribuotas tekstas tuščias arba neteisingas.")
         return "Maisto produktų nerasta."
 
-    # Process and format the dishes
-    dishes = result.split("\n")
-    formatted_output = "Aptikti patiekalai:\n" + "\n".join(dishes)
-    return formatted_output
+    return "Aptikti patiekalai:\n" + format_dishes(dishes)
+
+
+def _cache_key(query, model):
+    # Skirtingų modelių atsakymai talpykloje nesimaišo
+    return cache_key(query, model, PROMPT_VERSION)
+
+
+def _store(cache, query, response):
+    # Atsakymas saugomas pagal jį davusio modelio (pvz. atsarginio) raktą
+    cache.put(_cache_key(query, response.get("model") or get_backend().model), response)
+
+
+def _lookup(cache, query):
+    # Pirmiausia pagrindinio modelio atsakymas, paskui - atsarginio
+    for backend in (get_backend(), get_fallback_backend()):
+        if backend is not None:
+            response = cache.get(_cache_key(query, backend.model))
+            if response is not None:
+                return response
+    return None
+
+
+def local_response(query):
+    if not USE_LOCAL_EXTRACTOR:
+        return None
+    dishes = extract_dishes(query)
+    return {"text": format_dishes(dishes)} if dishes else None
+
+
+def _cached_call(query, priority=INTERACTIVE):
+    local = local_response(query)
+    if local is not None:
+        return local
+
+    # Klaidos į talpyklą nededamos, kad kitas bandymas vėl kreiptųsi į API
+    cache = get_response_cache()
+    response = _lookup(cache, query)
+    if response is None:
+        response = call_llama_api(query, priority)
+        if "text" in response:
+            _store(cache, query, response)
+    return response
 
 
 def send_query(query):
     if not query.strip():
         return "Prašome įvesti tinkamą patiekalą."
 
-    response = call_llama_api(query)
+    return process_response(_cached_call(query))
+
+
+def stream_query(query, on_dish):
+    # Kaip send_query, bet patiekalai perduodami on_dish vos tik atpažinti
+    if not query.strip():
+        return "Prašome įvesti tinkamą patiekalą."
+
+    cache = get_response_cache()
+    response = local_response(query) or _lookup(cache, query)
+    if response is not None:
+        for dish in parse_dish_names(response["text"]):
+            on_dish(dish)
+    else:
+        response = stream_llama_api(query, on_dish)
+        if "text" in response:
+            _store(cache, query, response)
     return process_response(response)
+
+
+def send_query_batch(queries, batch_size=BATCH_SIZE):
+    # Kaip send_query kiekvienam tekstui, bet API kviečiamas vienu kartu batch_size tekstų;
+    # jei paketinio atsakymo nepavyko išskaidyti, tie tekstai siunčiami po vieną.
+    # Ryšio klaida grąžinama visiems paketo tekstams, kad ji nebūtų kartojama kiekvienam atskirai
+    queries = list(queries)
+    responses = [None] * len(queries)
+    cache = get_response_cache()
+    pending = []
+    for index, query in enumerate(queries):
+        if not query.strip():
+            continue
+        responses[index] = local_response(query) or _lookup(cache, query)
+        if responses[index] is None:
+            pending.append(index)
+
+    for start in range(0, len(pending), batch_size):
+        indexes = pending[start:start + batch_size]
+        result = call_llama_api_batch([queries[index] for index in indexes])
+        if "error" in result:
+            for index in indexes:
+                responses[index] = result
+            continue
+
+        dishes = parse_batch_response(result["text"], len(indexes))
+        for position, index in enumerate(indexes):
+            if dishes is None:
+                responses[index] = _cached_call(queries[index], BACKFILL)
+            else:
+                responses[index] = {"text": format_dishes(dishes[position]), "model": result.get("model")}
+                _store(cache, queries[index], responses[index])
+
+    return [
+        process_response(response) if response is not None else "Prašome įvesti tinkamą patiekalą."
+        for response in responses
+    ]
+
+
+async def _call_with_timeout(query, timeout, executor, priority):
+    # (atsakymas, gijos future); po timeout gija nenutraukiama, bet jos atsakymas vis tiek patenka į talpyklą
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(executor, _cached_call, query, priority)
+    try:
+        response = await asyncio.wait_for(asyncio.shield(future), timeout)
+    except asyncio.TimeoutError:
+        response = {"error": f"Klaida jungiantis: atsakymo nesulaukta per {timeout} s"}
+    return response, future
+
+
+async def async_send_query(query, timeout=REQUEST_TIMEOUT, executor=None, priority=INTERACTIVE):
+    if not query.strip():
+        return "Prašome įvesti tinkamą patiekalą."
+
+    # HTTP kvietimas vyksta gijoje, kad neblokuotų įvykių ciklo
+    response, _ = await _call_with_timeout(query, timeout, executor, priority)
+    return process_response(response)
+
+
+async def async_send_queries(queries, concurrency=DEFAULT_CONCURRENCY, timeout=REQUEST_TIMEOUT):
+    # Vienu metu vykdoma ne daugiau kaip concurrency užklausų; rezultatai ta pačia tvarka kaip queries
+    semaphore = asyncio.Semaphore(concurrency)
+
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="llm")
+
+    def release(future):
+        if not future.cancelled():
+            future.exception()
+        semaphore.release()
+
+    async def bounded(query):
+        if not query.strip():
+            return "Prašome įvesti tinkamą patiekalą."
+        await semaphore.acquire()
+        future = None
+        try:
+            response, future = await _call_with_timeout(query, timeout, executor, BACKFILL)
+        finally:
+            # Po timeout gija dar dirba: vieta atlaisvinama tik jai baigus, kitaip kitos užklausos
+            # lauktų vykdytojo eilėje ir tas laukimas būtų įskaičiuotas į jų timeout
+            if future is None or future.done():
+                semaphore.release()
+            else:
+                future.add_done_callback(release)
+        return process_response(response)
+
+    try:
+        return await asyncio.gather(*(bounded(query) for query in queries))
+    finally:
+        # Nelaukiama užstrigusių (timeout) gijų
+        executor.shutdown(wait=False)
+
+
+def send_queries(queries, concurrency=DEFAULT_CONCURRENCY, timeout=REQUEST_TIMEOUT):
+    return asyncio.run(async_send_queries(list(queries), concurrency, timeout))
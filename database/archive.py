@@ -0,0 +1,65 @@
+import sqlite3
+from datetime import datetime
+
+from database.migrations import create_archive_schema
+
+ARCHIVE_HORIZON_DAYS = 365
+
+# Archyvo failas vienam periodui: data_2023.db arba data_2023-05.db
+ARCHIVE_FORMATS = {
+    'year': '%Y',
+    'month': '%Y-%m',
+}
+
+
+def period_bounds(key, granularity):
+    # [pradžia, pabaiga) archyvo periodui pagal strftime raktą
+    if granularity == 'year':
+        year = int(key)
+        return datetime(year, 1, 1), datetime(year + 1, 1, 1)
+    year, month = (int(part) for part in key.split('-'))
+    if month == 12:
+        return datetime(year, 12, 1), datetime(year + 1, 1, 1)
+    return datetime(year, month, 1), datetime(year, month + 1, 1)
+
+
+def schema_name(key):
+    return "archive_" + key.replace('-', '_')
+
+
+def create_archive_file(path):
+    conn = sqlite3.connect(path)
+    try:
+        # WAL, kad snapshot() skaitymai neblokuotų rašymų į archyvą
+        conn.execute("PRAGMA journal_mode=WAL")
+        with conn:
+            create_archive_schema(conn)
+    finally:
+        conn.close()
+
+
+def write_archive_file(path, sql, params=()):
+    # Rašymas tiesiai į archyvo failą, nes ATTACH negalimas atviroje transakcijoje
+    conn = sqlite3.connect(path)
+    try:
+        with conn:
+            return conn.execute(sql, params).rowcount
+    finally:
+        conn.close()
+
+
+def read_archive_file(path, sql, params=()):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(sql, params).fetchone()
+    finally:
+        conn.close()
+
+
+def read_archive_rows(path):
+    # Visos archyvo eilutės, kai archyvo nebegalima prijungti (ATTACH riba)
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT id, product_name, created_at FROM Product").fetchall()
+    finally:
+        conn.close()
@@ -0,0 +1,45 @@
+import threading
+from collections import OrderedDict
+
+CACHE_SIZE = 64
+
+
+class QueryCache:
+    # LRU užklausų rezultatų talpykla; invalidate() kviečiamas po kiekvieno rašymo commit
+
+    def __init__(self, maxsize=CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get_or_load(self, key, load):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            generation = self._generation
+
+        value = load()
+
+        with self._lock:
+            # Jei kol skaitėme įvyko rašymas, rezultatas gali būti pasenęs - nesaugome
+            if generation == self._generation and self.maxsize > 0:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
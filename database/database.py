@@ -1,112 +1,710 @@
 import sqlite3
 import os
+import re
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+
+from database.archive import (
+    ARCHIVE_FORMATS, ARCHIVE_HORIZON_DAYS, create_archive_file, period_bounds, read_archive_file,
+    read_archive_rows, schema_name, write_archive_file
+)
+from database.cache import QueryCache, CACHE_SIZE
+from database.migrations import (
+    SUMMARY_ADD, SUMMARY_BACKFILL, SUMMARY_CLEANUP, SUMMARY_REMOVE, migrate, schema_version
+)
 
 DB_FILE = os.path.join(os.path.dirname(__file__), "..", "database", "data.db")
 
+# Nustatymai ilgai gyvenančiam prisijungimui
+BUSY_TIMEOUT_MS = 5000
+MMAP_SIZE = 64 * 1024 * 1024
+IMPORT_CHUNK_SIZE = 1000
+PAGE_SIZE = 50
+# SQLite pagal nutylėjimą leidžia prijungti ne daugiau kaip 10 DB; likę archyvai skaitomi į TEMP lentelę
+MAX_ATTACHED = 10
+OVERFLOW_TABLE = "temp.ArchiveOverflow"
+OVERFLOW_SEARCH = "temp.ArchiveOverflowSearch"
+# created_at saugomas kaip CURRENT_TIMESTAMP (UTC) tekstas
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+PERIOD_QUERY_TEMPLATE = """
+    SELECT * FROM {source}
+    WHERE created_at >= ? AND created_at < ?
+    ORDER BY created_at DESC, id
+"""
+PERIOD_QUERY = PERIOD_QUERY_TEMPLATE.format(source="Product")
+
+PERIOD_FORMATS = {
+    'day': '%Y-%m-%d',
+    'week': '%Y-%W',
+    'month': '%Y-%m',
+}
+
+SEARCH_TOKEN = re.compile(r"\w+")
+
+# main.Product eilutės iš [?, ?), kurių tiksli kopija jau yra archyve {name}
+ARCHIVED_ROWS = """
+    created_at >= ? AND created_at < ? AND EXISTS (
+        SELECT 1 FROM {name}.Product AS copy
+        WHERE copy.id = main.Product.id AND copy.product_name = main.Product.product_name
+        AND copy.created_at IS main.Product.created_at
+    )
+"""
+# Vienos Product lentelės paieška per jos FTS5 indeksą {search}
+SEARCH_QUERY = """
+    SELECT {table}.id, {table}.product_name, {table}.created_at FROM {search}(?) AS search
+    JOIN {table} ON {table}.id = search.rowid
+    WHERE {where}
+"""
+# Archyvo eilutės, kurių dar (ar vėl) yra pagrindinėje DB, praleidžiamos - kitaip tarp
+# archive_older_than fazių jos būtų matomos dukart
+NOT_IN_MAIN = "NOT EXISTS (SELECT 1 FROM main.Product AS current WHERE current.id = {table}.id)"
+
+
+def _utc_now():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def build_search_query(text):
+    # Kiekvienas žodis - kabutėse ir su prefikso '*', kad vartotojo įvestis nebūtų FTS5 sintaksė
+    return " ".join(f'"{token}"*' for token in SEARCH_TOKEN.findall(text))
+
+
+def day_range(now):
+    start = datetime(now.year, now.month, now.day)
+    return start, start + timedelta(days=1)
+
+
+def week_range(now):
+    # Kaip strftime('%W') + '%Y': savaitė prasideda pirmadienį ir nekerta metų ribos
+    day_start, _ = day_range(now)
+    start = day_start - timedelta(days=now.weekday())
+    end = start + timedelta(days=7)
+    return max(start, datetime(now.year, 1, 1)), min(end, datetime(now.year + 1, 1, 1))
+
+
+def month_range(now):
+    start = datetime(now.year, now.month, 1)
+    if now.month == 12:
+        return start, datetime(now.year + 1, 1, 1)
+    return start, datetime(now.year, now.month + 1, 1)
+
+
+
 class Database:
 
-    def __init__(self):
-        self.db_file = DB_FILE
+    def __init__(self, db_file=None, cache_size=CACHE_SIZE):
+        self.db_file = db_file or DB_FILE
+        self.cache = QueryCache(cache_size)
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        # Didinamas po kiekvieno archyvų pakeitimo, kad būtų perkrauta TEMP archyvų lentelė
+        self._archive_version = 0
         self.create_tables()
 
-    def get_connection(self):
-        conn = sqlite3.connect(self.db_file)
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def get_connection(self, check_same_thread=True):
+        conn = sqlite3.connect(self.db_file, timeout=BUSY_TIMEOUT_MS / 1000,
+                               check_same_thread=check_same_thread)
         conn.row_factory = sqlite3.Row
         return conn
 
-    def create_tables(self):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS Product (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            product_name TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        ''')
+    def _configure(self, conn):
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+        conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+
+    def _connection(self):
+        # Vienas prisijungimas kiekvienai gijai; atidaromas iš naujo, jei pasikeitė db_file
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.db_file == self.db_file:
+            return conn
+        if conn is not None:
+            self._release(conn)
 
-        conn.commit()
+        # close() gali būti kviečiamas iš kitos gijos
+        conn = self.get_connection(check_same_thread=False)
+        self._configure(conn)
+        self._local.conn = conn
+        self._local.db_file = self.db_file
+        with self._lock:
+            self._connections.append(conn)
+        return conn
+
+    def _release(self, conn):
+        with self._lock:
+            if conn in self._connections:
+                self._connections.remove(conn)
         conn.close()
 
+    def close(self):
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+    @contextmanager
+    def transaction(self, archives=()):
+        # Viena transakcija keliems rašymams; įdėti transaction() nekomituoja patys.
+        # archives prijungiami prieš BEGIN, kad jų keitimai būtų tos pačios transakcijos dalis
+        conn = self._connection()
+        if getattr(self._local, "in_transaction", False):
+            yield conn
+            return
+
+        self._local.in_transaction = True
+        try:
+            self._attach(conn, archives)
+            conn.execute("BEGIN IMMEDIATE")
+            with conn:
+                yield conn
+        finally:
+            self._local.in_transaction = False
+            if getattr(self._local, "archives_changed", False):
+                self._local.archives_changed = False
+                self._archive_version += 1
+        self.cache.invalidate()
+
+    def _archive_path(self, file_name):
+        return os.path.join(os.path.dirname(os.path.abspath(self.db_file)), file_name)
+
+    def list_archives(self):
+        cursor = self._connection().execute('SELECT name, file, start, end FROM Archive ORDER BY start DESC')
+        return [dict(a) for a in cursor.fetchall()]
+
+    def _product_source(self, start=None, end=None):
+        # FROM dalis: tik Product, arba UNION ALL su archyvais, kurie kertasi su [start, end]
+        archives = [
+            a for a in self.list_archives()
+            if (start is None or a["end"] > start) and (end is None or a["start"] <= end)
+        ]
+        if not archives:
+            return "Product"
+
+        direct, overflow = self._attach_archives(archives)
+        tables = [f"{a['name']}.Product" for a in direct]
+        if overflow:
+            tables.append(self._load_overflow(overflow))
+        parts = ["SELECT id, product_name, created_at FROM main.Product"]
+        parts += [
+            f"SELECT id, product_name, created_at FROM {table} WHERE {NOT_IN_MAIN.format(table=table)}"
+            for table in tables
+        ]
+        return "(" + " UNION ALL ".join(parts) + ") AS Product"
+
+    def _attach(self, conn, archives):
+        # Prijungia archives; jei viršytų MAX_ATTACHED, pirmiau atjungia šiuo metu nereikalingus
+        attached = {row["name"] for row in conn.execute("PRAGMA database_list")} - {"main", "temp"}
+        missing = [a for a in archives if a["name"] not in attached]
+        excess = len(attached) + len(missing) - MAX_ATTACHED
+        if excess > 0:
+            for name in sorted(attached - {a["name"] for a in archives})[:excess]:
+                conn.execute(f"DETACH DATABASE {name}")
+        for archive in missing:
+            conn.execute("ATTACH DATABASE ? AS " + archive["name"], (self._archive_path(archive["file"]),))
+
+    def _attach_archives(self, archives):
+        # (prijungti, netilpę) - naujausi archyvai prijungiami, senesni skaitomi per TEMP lentelę
+        direct, overflow = archives[:MAX_ATTACHED], archives[MAX_ATTACHED:]
+        self._attach(self._connection(), direct)
+        return direct, overflow
+
+    def _load_overflow(self, archives):
+        # Netilpusių archyvų eilutės TEMP lentelėje; perkraunamos tik pasikeitus archyvams
+        conn = self._connection()
+        key = (conn, tuple(a["name"] for a in archives), self._archive_version)
+        if getattr(self._local, "overflow", None) != key:
+            with conn:
+                _fill_overflow(conn, [self._archive_path(archive["file"]) for archive in archives])
+            self._local.overflow = key
+        return OVERFLOW_TABLE
+
+    def archive_older_than(self, cutoff=None, granularity='year'):
+        # Perkelia senesnes nei cutoff eilutes į atskirus failus pagal metus arba mėnesį
+        if granularity not in ARCHIVE_FORMATS:
+            raise ValueError(f"Nežinomas archyvo periodas: {granularity}")
+        if cutoff is None:
+            cutoff = _utc_now() - timedelta(days=ARCHIVE_HORIZON_DAYS)
+        cutoff = cutoff.strftime(TIMESTAMP_FORMAT)
+
+        conn = self._connection()
+        keys = [row[0] for row in conn.execute(
+            "SELECT DISTINCT strftime(?, created_at) FROM Product WHERE created_at < ?",
+            (ARCHIVE_FORMATS[granularity], cutoff)
+        ) if row[0] is not None]
+
+        stem = os.path.splitext(os.path.basename(self.db_file))[0]
+        registered = {archive["name"] for archive in self.list_archives()}
+        moved = 0
+        for key in keys:
+            name = schema_name(key)
+            file_name = f"{stem}_{key}.db"
+            start, end = (bound.strftime(TIMESTAMP_FORMAT) for bound in period_bounds(key, granularity))
+            archive = {"name": name, "file": file_name}
+            create_archive_file(self._archive_path(file_name))
+            params = (start, min(end, cutoff))
+
+            # Commit per kelis WAL failus nėra atomiškas, todėl dvi fazės, kiekviena rašo tik į vieną failą.
+            # 1: eilučių kopijos į archyvą (OR REPLACE - kartojant po nutrūkimo atnaujinamos)
+            with self.transaction([archive]) as conn:
+                if name not in registered:
+                    # Neįregistruotame faile gali likti delete_all_products nepašalintos eilutės
+                    conn.execute(f"DELETE FROM {name}.Product WHERE id NOT IN (SELECT id FROM main.Product)")
+                else:
+                    self._local.archives_changed = True
+                conn.execute(f"""
+                    INSERT OR REPLACE INTO {name}.Product (id, product_name, created_at)
+                    SELECT id, product_name, created_at FROM main.Product
+                    WHERE created_at >= ? AND created_at < ?
+                """, params)
+
+            # 2: iš pagrindinės DB šalinamos tik tos eilutės, kurių tikslios kopijos jau archyve;
+            # tarp fazių pakeistos ar pridėtos lieka ir bus perkeltos kitą kartą
+            copied = ARCHIVED_ROWS.format(name=name)
+            with self.transaction([archive]) as conn:
+                # DELETE trigeriai sumažins DailySummary - iš anksto pridedame, kad suvestinė liktų ta pati
+                conn.execute(SUMMARY_BACKFILL.format(source="main.Product", where=copied), params)
+                moved += conn.execute(f"DELETE FROM main.Product WHERE {copied}", params).rowcount
+                conn.execute(
+                    "INSERT OR IGNORE INTO Archive (name, file, start, end) VALUES (?, ?, ?, ?)",
+                    (name, file_name, start, end)
+                )
+                self._local.archives_changed = True
+        return moved
+
+    def archives_for(self, product_ids):
+        # Archyvai su product_ids eilutėmis, kurių nėra pagrindinėje DB - juos reikia prijungti prieš transakciją
+        if not product_ids:
+            return []
+        conn = self._connection()
+        marks = ", ".join("?" * len(product_ids))
+        in_main = {row[0] for row in conn.execute(f"SELECT id FROM main.Product WHERE id IN ({marks})", product_ids)}
+        missing = [product_id for product_id in product_ids if product_id not in in_main]
+        if not missing:
+            return []
+        marks = ", ".join("?" * len(missing))
+        return [
+            archive for archive in self.list_archives()
+            if self._execute_archive(conn, archive, f"SELECT 1 FROM {{table}} WHERE id IN ({marks})", missing, fetch=True)
+        ][:MAX_ATTACHED]
+
+    def _execute_archive(self, conn, archive, sql, params=(), fetch=False):
+        # sql su {table} vietoj lentelės pavadinimo
+        attached = {row["name"] for row in conn.execute("PRAGMA database_list")}
+        if archive["name"] in attached:
+            # Prijungtas archyvas naudojamas toje pačioje transakcijoje
+            if not fetch:
+                self._local.archives_changed = True
+            cursor = conn.execute(sql.format(table=f"{archive['name']}.Product"), params)
+            return cursor.fetchone() if fetch else cursor.rowcount
+        if fetch:
+            return read_archive_file(self._archive_path(archive["file"]), sql.format(table="Product"), params)
+        # Rašymas atskiru prisijungimu nebūtų atšauktas kartu su transakcija
+        raise sqlite3.OperationalError(
+            f"Archyvas {archive['name']} neprijungtas: jį reikia perduoti transaction(archives_for(...))"
+        )
+
+    def _change_archived_product(self, conn, product_id, sql, params):
+        # Archyvuotos eilutės keitimas; DailySummary koreguojama ranka, nes archyvuose trigerių nėra
+        for archive in self.list_archives():
+            old = self._execute_archive(
+                conn, archive, 'SELECT product_name, created_at FROM {table} WHERE id = ?', (product_id,), fetch=True
+            )
+            if old is None:
+                continue
+            self._execute_archive(conn, archive, sql, params)
+            self._summary_remove(conn, old[1], old[0])
+            new = self._execute_archive(
+                conn, archive, 'SELECT product_name, created_at FROM {table} WHERE id = ?', (product_id,), fetch=True
+            )
+            if new is not None:
+                self._summary_add(conn, new[1], new[0])
+            return
+
+    def _summary_add(self, conn, created_at, product_name):
+        conn.execute(SUMMARY_ADD.format(day="date(:created_at)", name=":product_name"),
+                     {"created_at": created_at, "product_name": product_name})
+
+    def _summary_remove(self, conn, created_at, product_name):
+        conn.execute(SUMMARY_REMOVE.format(day="date(:created_at)", name=":product_name"),
+                     {"created_at": created_at, "product_name": product_name})
+        conn.execute(SUMMARY_CLEANUP)
+
+    def _cached(self, key, load):
+        # Grąžinamos kopijos, kad kviečiantis kodas negadintų talpyklos įrašų
+        rows = self.cache.get_or_load(key, load)
+        return [dict(p) for p in rows]
+
+    def cache_stats(self):
+        return self.cache.stats()
+
+    @contextmanager
+    def snapshot(self, copy=False):
+        # Nuosekli DB būsena ataskaitoms ir eksportui; neblokuoja rašymų ir jų neblokuoja.
+        # copy=True - kopija atmintyje per backup API, kitaip - WAL skaitymo transakcija
+        snap = Snapshot(self.db_file, self.list_archives(), copy)
+        try:
+            yield snap
+        finally:
+            snap.close()
+
+    @contextmanager
+    def savepoint(self, name="write_op"):
+        # Atšaukia tik vieną operaciją, nenutraukdamas visos transakcijos
+        conn = self._connection()
+        conn.execute(f"SAVEPOINT {name}")
+        try:
+            yield conn
+        except Exception:
+            conn.execute(f"ROLLBACK TO {name}")
+            conn.execute(f"RELEASE {name}")
+            raise
+        conn.execute(f"RELEASE {name}")
+
+    def create_tables(self):
+        # Schema kuriama ir atnaujinama migracijomis pagal PRAGMA user_version
+        migrate(self)
+
+    def schema_version(self):
+        return schema_version(self._connection())
+
+    def query_plan(self, sql, params=()):
+        # EXPLAIN QUERY PLAN eilutės, kad testai pastebėtų pilną lentelės skenavimą
+        rows = self._connection().execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+        return [row["detail"] for row in rows]
+
     def add_product(self, product_name, created_at=None):
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self.transaction() as conn:
+            if created_at is None:
+                conn.execute('INSERT INTO Product (product_name) VALUES (?)', (product_name,))
+            else:
+                conn.execute('INSERT INTO Product (product_name, created_at) VALUES (?, ?)',
+                             (product_name, created_at))
 
-        if created_at is None:
-            cursor.execute('INSERT INTO Product (product_name) VALUES (?)', (product_name,))
-        else:
-            cursor.execute('INSERT INTO Product (product_name, created_at) VALUES (?, ?)',
-                           (product_name, created_at))
+    def add_products(self, products):
+        # products: pavadinimai arba (pavadinimas, created_at) poros; viena transakcija
+        rows = [(p, None) if isinstance(p, str) else tuple(p) for p in products]
+        if not rows:
+            return []
 
-        conn.commit()
-        conn.close()
+        with self.transaction() as conn:
+            conn.executemany(
+                'INSERT INTO Product (product_name, created_at) VALUES (?, COALESCE(?, CURRENT_TIMESTAMP))',
+                rows
+            )
+            # AUTOINCREMENT toje pačioje transakcijoje duoda iš eilės einančius id
+            last_id = conn.execute('SELECT last_insert_rowid()').fetchone()[0]
+        return list(range(last_id - len(rows) + 1, last_id + 1))
 
-    def update_product(self, product_id, product_name):
-        conn = self.get_connection()
-        cursor = conn.cursor()
+    def add_products_chunked(self, products, chunk_size=IMPORT_CHUNK_SIZE):
+        ids = []
+        products = iter(products)
+        while True:
+            chunk = list(islice(products, chunk_size))
+            if not chunk:
+                return ids
+            ids.extend(self.add_products(chunk))
 
-        cursor.execute('UPDATE Product SET product_name = ? WHERE id = ?', (product_name, product_id))
-        conn.commit()
-        conn.close()
+    def update_product(self, product_id, product_name):
+        with self.transaction(self.archives_for([product_id])) as conn:
+            sql, params = 'UPDATE {table} SET product_name = ? WHERE id = ?', (product_name, product_id)
+            if conn.execute(sql.format(table="main.Product"), params).rowcount == 0:
+                self._change_archived_product(conn, product_id, sql, params)
 
     def get_all_products(self):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM Product ORDER BY created_at DESC')
-        products = cursor.fetchall()
-        conn.close()
-        return [dict(p) for p in products]
+        return self._cached(("all",), self._load_all_products)
+
+    def _load_all_products(self):
+        source = self._product_source()
+        cursor = self._connection().execute(f'SELECT * FROM {source} ORDER BY created_at DESC, id')
+        return [dict(p) for p in cursor.fetchall()]
+
+    def get_products_page(self, before_created_at=None, before_id=None, limit=PAGE_SIZE):
+        # Keyset puslapiavimas: (before_created_at, before_id) - paskutinė ankstesnio puslapio eilutė.
+        # Tvarka kaip get_all_products: created_at DESC, id ASC
+        return self._cached(("page", before_created_at, before_id, limit),
+                            lambda: self._load_products_page(before_created_at, before_id, limit))
+
+    def _load_products_page(self, before_created_at, before_id, limit):
+        source = self._product_source(end=before_created_at)
+        conn = self._connection()
+        if before_created_at is None:
+            cursor = conn.execute(f'SELECT * FROM {source} ORDER BY created_at DESC, id LIMIT ?', (limit,))
+        else:
+            cursor = conn.execute(f"""
+                SELECT * FROM {source}
+                WHERE created_at <= ? AND (created_at < ? OR id > ?)
+                ORDER BY created_at DESC, id
+                LIMIT ?
+            """, (before_created_at, before_created_at, before_id, limit))
+        return [dict(p) for p in cursor.fetchall()]
+
+    def iter_products(self, batch_size=IMPORT_CHUNK_SIZE):
+        source = self._product_source()
+        cursor = self._connection().execute(f'SELECT * FROM {source} ORDER BY created_at DESC, id')
+        try:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                for row in rows:
+                    yield dict(row)
+        finally:
+            cursor.close()
+
+    def search_products(self, query, limit=PAGE_SIZE):
+        match = build_search_query(query)
+        if not match:
+            return []
+        # Kiekvienas archyvas turi savo ProductSearch; netilpusių - bendras TEMP indeksas
+        direct, overflow = self._attach_archives(self.list_archives())
+        sources = [(f"{a['name']}.ProductSearch", f"{a['name']}.Product") for a in direct]
+        if overflow:
+            sources.append((OVERFLOW_SEARCH, self._load_overflow(overflow)))
+        parts = [SEARCH_QUERY.format(search="main.ProductSearch", table="main.Product", where="1")]
+        parts += [
+            SEARCH_QUERY.format(search=search, table=table, where=NOT_IN_MAIN.format(table=table))
+            for search, table in sources
+        ]
+        cursor = self._connection().execute(
+            " UNION ALL ".join(parts) + " ORDER BY created_at DESC, id LIMIT ?",
+            (match,) * len(parts) + (limit,)
+        )
+        return [dict(p) for p in cursor.fetchall()]
 
     def delete_all_products(self):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('DELETE FROM Product')
-        conn.commit()
-        conn.close()
+        # Archyvai tik išregistruojami toje pačioje transakcijoje - nebeįtraukti į Archive failai neskaitomi
+        archives = self.list_archives()
+        nested = getattr(self._local, "in_transaction", False)
+        with self.transaction() as conn:
+            conn.execute('DELETE FROM main.Product')
+            conn.execute('DELETE FROM Archive')
+            conn.execute('DELETE FROM DailySummary')
+            self._local.archives_changed = True
+        if nested:
+            # Išorinė transakcija dar gali būti atšaukta; likusias eilutes išvalys archive_older_than
+            return
+        for archive in archives:
+            write_archive_file(self._archive_path(archive["file"]), 'DELETE FROM Product')
 
     def delete_product(self, product_id):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('DELETE FROM Product WHERE id = ?', (product_id,))
-        conn.commit()
-        conn.close()
+        with self.transaction(self.archives_for([product_id])) as conn:
+            sql, params = 'DELETE FROM {table} WHERE id = ?', (product_id,)
+            if conn.execute(sql.format(table="main.Product"), params).rowcount == 0:
+                self._change_archived_product(conn, product_id, sql, params)
+
+    def get_products_between(self, start, end):
+        # Pusiau atviras intervalas [start, end), kad būtų naudojamas idx_product_created_at
+        params = (start.strftime(TIMESTAMP_FORMAT), end.strftime(TIMESTAMP_FORMAT))
+        return self._cached(("between",) + params, lambda: self._load_products_between(params))
+
+    def _load_products_between(self, params):
+        source = self._product_source(*params)
+        cursor = self._connection().execute(PERIOD_QUERY_TEMPLATE.format(source=source), params)
+        return [dict(p) for p in cursor.fetchall()]
+
+    def _range_filter(self, start, end):
+        # WHERE dalis agregavimo užklausoms; None reiškia neribotą intervalo galą
+        clauses, params = [], []
+        if start is not None:
+            clauses.append('created_at >= ?')
+            params.append(start.strftime(TIMESTAMP_FORMAT))
+        if end is not None:
+            clauses.append('created_at < ?')
+            params.append(end.strftime(TIMESTAMP_FORMAT))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        return where, params
+
+    def _range_source(self, start, end):
+        return self._product_source(
+            start.strftime(TIMESTAMP_FORMAT) if start is not None else None,
+            end.strftime(TIMESTAMP_FORMAT) if end is not None else None
+        )
+
+    def dish_frequency(self, start=None, end=None, limit=None):
+        # [(product_name, count), ...] nuo dažniausiai valgyto
+        where, params = self._range_filter(start, end)
+        sql = f"""
+            SELECT product_name, COUNT(*) FROM {self._range_source(start, end)}
+            {where}
+            GROUP BY product_name
+            ORDER BY COUNT(*) DESC, product_name
+        """
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        return [tuple(row) for row in self._connection().execute(sql, params)]
+
+    def count_by_period(self, period='day', start=None, end=None):
+        # [(periodas, count), ...] chronologine tvarka; periodas: 'day', 'week' arba 'month'
+        if period not in PERIOD_FORMATS:
+            raise ValueError(f"Nežinomas periodas: {period}")
+        where, params = self._range_filter(start, end)
+        sql = f"""
+            SELECT strftime(?, created_at) AS bucket, COUNT(*) FROM {self._range_source(start, end)}
+            {where}
+            GROUP BY bucket
+            ORDER BY bucket
+        """
+        return [tuple(row) for row in self._connection().execute(sql, [PERIOD_FORMATS[period], *params])]
+
+    def dish_first_last(self, product_name=None):
+        # [(product_name, pirmas kartas, paskutinis kartas), ...]
+        source = self._product_source()
+        if product_name is None:
+            cursor = self._connection().execute(f"""
+                SELECT product_name, MIN(created_at), MAX(created_at) FROM {source}
+                GROUP BY product_name
+                ORDER BY product_name
+            """)
+        else:
+            cursor = self._connection().execute(f"""
+                SELECT product_name, MIN(created_at), MAX(created_at) FROM {source}
+                WHERE product_name = ?
+                GROUP BY product_name
+            """, (product_name,))
+        return [tuple(row) for row in cursor]
+
+    def _summary_filter(self, start, end):
+        # DailySummary ribos - dienų tikslumu
+        clauses, params = [], []
+        if start is not None:
+            clauses.append('day >= ?')
+            params.append(start.strftime('%Y-%m-%d'))
+        if end is not None:
+            clauses.append('day < ?')
+            params.append(end.strftime('%Y-%m-%d'))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        return where, params
+
+    def summary_count_by_period(self, period='day', start=None, end=None):
+        # Kaip count_by_period, bet iš DailySummary: O(dienų intervale), ne O(eilučių)
+        if period not in PERIOD_FORMATS:
+            raise ValueError(f"Nežinomas periodas: {period}")
+        where, params = self._summary_filter(start, end)
+        sql = f"""
+            SELECT strftime(?, day) AS bucket, SUM(count) FROM DailySummary
+            {where}
+            GROUP BY bucket
+            ORDER BY bucket
+        """
+        return [tuple(row) for row in self._connection().execute(sql, [PERIOD_FORMATS[period], *params])]
+
+    def summary_dish_frequency(self, start=None, end=None, limit=None):
+        # Kaip dish_frequency, bet iš DailySummary
+        where, params = self._summary_filter(start, end)
+        sql = f"""
+            SELECT product_name, SUM(count) AS total FROM DailySummary
+            {where}
+            GROUP BY product_name
+            ORDER BY total DESC, product_name
+        """
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        return [tuple(row) for row in self._connection().execute(sql, params)]
+
+    def rebuild_daily_summary(self):
+        # Perskaičiuoja suvestinę iš Product ir archyvų, jei ji išsiderino (pvz. rašant į DB tiesiogiai)
+        source = self._product_source()
+        with self.transaction() as conn:
+            conn.execute('DELETE FROM DailySummary')
+            conn.execute(SUMMARY_BACKFILL.format(source=source, where="1"))
 
     def get_products_today(self):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT * FROM Product 
-            WHERE DATE(created_at) = DATE('now') 
-            ORDER BY created_at DESC
-        """)
-        products = cursor.fetchall()
-        conn.close()
-        return [dict(p) for p in products]
+        return self.get_products_between(*day_range(_utc_now()))
 
     def get_products_this_week(self):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT * FROM Product
-            WHERE strftime('%W', created_at) = strftime('%W', 'now')
-            AND strftime('%Y', created_at) = strftime('%Y', 'now')
-            ORDER BY created_at DESC
-        """)
-        products = cursor.fetchall()
-        conn.close()
-        return [dict(p) for p in products]
+        return self.get_products_between(*week_range(_utc_now()))
 
     def get_products_this_month(self):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT * FROM Product
-            WHERE strftime('%m', created_at) = strftime('%m', 'now')
-            AND strftime('%Y', created_at) = strftime('%Y', 'now')
-            ORDER BY created_at DESC
-        """)
-        products = cursor.fetchall()
-        conn.close()
-        return [dict(p) for p in products]
+        return self.get_products_between(*month_range(_utc_now()))
+
+
+def _fill_overflow(conn, paths):
+    # Netilpusių archyvų eilutės ir jų paieškos indeksas TEMP lentelėse
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {OVERFLOW_TABLE} (id INTEGER PRIMARY KEY, product_name TEXT, created_at TEXT)")
+    conn.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {OVERFLOW_SEARCH} USING fts5(
+            product_name, content='ArchiveOverflow', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+        )
+    """)
+    conn.execute(f"DELETE FROM {OVERFLOW_TABLE}")
+    for path in paths:
+        conn.executemany(f"INSERT INTO {OVERFLOW_TABLE} VALUES (?, ?, ?)", read_archive_rows(path))
+    conn.execute(f"INSERT INTO {OVERFLOW_SEARCH} (ArchiveOverflowSearch) VALUES ('rebuild')")
+
+
+def _read_only_uri(path):
+    return Path(path).resolve().as_uri() + "?mode=ro"
+
+
+class Snapshot(Database):
+    # Tik skaitymui skirtas Database vaizdas vienoje, visą laiką atviroje skaitymo transakcijoje
+
+    def __init__(self, db_file, archives, copy=False):
+        self.db_file = db_file
+        self.cache = QueryCache(0)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+        conn = sqlite3.connect(_read_only_uri(db_file), uri=True, timeout=BUSY_TIMEOUT_MS / 1000,
+                               check_same_thread=False)
+        if copy:
+            source, conn = conn, sqlite3.connect(":memory:", check_same_thread=False)
+            source.backup(conn)
+            source.close()
+        conn.row_factory = sqlite3.Row
+        # Transakcijas valdome patys
+        conn.isolation_level = None
+
+        # ATTACH negalimas transakcijos viduje, todėl archyvai prijungiami iš anksto;
+        # netilpę į MAX_ATTACHED nukopijuojami į TEMP lentelę
+        self._attached = {archive["name"] for archive in archives[:MAX_ATTACHED]}
+        for archive in archives[:MAX_ATTACHED]:
+            conn.execute("ATTACH DATABASE ? AS " + archive["name"],
+                         (_read_only_uri(self._archive_path(archive["file"])),))
+        _fill_overflow(conn, [self._archive_path(archive["file"]) for archive in archives[MAX_ATTACHED:]])
+
+        conn.execute("BEGIN")
+        # Skaitymo transakcija prasideda nuo pirmo skaitymo kiekvienoje DB
+        conn.execute("SELECT COUNT(*) FROM main.sqlite_master").fetchone()
+        for archive in archives[:MAX_ATTACHED]:
+            conn.execute(f"SELECT COUNT(*) FROM {archive['name']}.sqlite_master").fetchone()
+
+        self._conn = conn
+        self._connections = [conn]
+
+    def _connection(self):
+        return self._conn
+
+    def _attach_archives(self, archives):
+        direct = [a for a in archives if a["name"] in self._attached]
+        return direct, [a for a in archives if a["name"] not in self._attached]
+
+    def _load_overflow(self, archives):
+        return OVERFLOW_TABLE
+
+    @contextmanager
+    def transaction(self):
+        raise sqlite3.OperationalError("Snapshot skirtas tik skaitymui")
+        yield  # pragma: no cover
 
+    def close(self):
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            conn.close()
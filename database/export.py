@@ -0,0 +1,99 @@
+import csv
+import gzip
+import json
+import os
+import sys
+from itertools import islice
+from pathlib import Path
+
+from database.database import Database, IMPORT_CHUNK_SIZE
+
+FIELDS = ["id", "product_name", "created_at"]
+FORMATS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+
+def detect_format(path):
+    # data.csv, data.ndjson.gz ir pan.; grąžina (formatas, ar gzip)
+    suffixes = Path(path).suffixes
+    compressed = bool(suffixes) and suffixes[-1] == ".gz"
+    if compressed:
+        suffixes = suffixes[:-1]
+    if not suffixes or suffixes[-1] not in FORMATS:
+        raise ValueError(f"Nežinomas failo formatas: {path}")
+    return FORMATS[suffixes[-1]], compressed
+
+
+def _open(path, mode, compressed):
+    if compressed:
+        return gzip.open(path, mode + "t", encoding="utf-8", newline="")
+    return open(path, mode, encoding="utf-8", newline="")
+
+
+def export_products(db, path, batch_size=IMPORT_CHUNK_SIZE):
+    # Visos Product eilutės į CSV arba NDJSON (galima .gz) srautu; grąžina eilučių skaičių
+    fmt, compressed = detect_format(path)
+    count = 0
+    # Snapshot: eksportas mato vieną DB būseną ir nestabdo tuo metu vykstančių rašymų
+    with db.snapshot() as snap, _open(path, "w", compressed) as f:
+        if fmt == "csv":
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            for product in snap.iter_products(batch_size):
+                writer.writerow(product)
+                count += 1
+        else:
+            for product in snap.iter_products(batch_size):
+                f.write(json.dumps(product, ensure_ascii=False) + "\n")
+                count += 1
+    return count
+
+
+def _read_rows(path):
+    fmt, compressed = detect_format(path)
+    with _open(path, "r", compressed) as f:
+        if fmt == "csv":
+            for row in csv.DictReader(f):
+                yield row["product_name"], row.get("created_at") or None
+        else:
+            for line in f:
+                if line.strip():
+                    row = json.loads(line)
+                    yield row["product_name"], row.get("created_at") or None
+
+
+def import_products(db, path, chunk_size=IMPORT_CHUNK_SIZE):
+    # Importuoja dalimis po chunk_size; nutrūkus tęsia nuo paskutinės įrašytos dalies
+    source = os.path.abspath(path)
+    conn = db._connection()
+    progress = conn.execute("SELECT rows_done FROM ImportProgress WHERE source = ?", (source,)).fetchone()
+    rows_done = progress[0] if progress else 0
+
+    # Įrašyti id nekeliami - gauna naujus, kad nesikirstų su esamais
+    rows = islice(_read_rows(path), rows_done, None)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        with db.transaction():
+            db.add_products(chunk)
+            rows_done += len(chunk)
+            conn.execute(
+                "INSERT OR REPLACE INTO ImportProgress (source, rows_done) VALUES (?, ?)", (source, rows_done)
+            )
+
+    with db.transaction():
+        conn.execute("DELETE FROM ImportProgress WHERE source = ?", (source,))
+    return rows_done
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3 or sys.argv[1] not in ("export", "import"):
+        print("Naudojimas: python -m database.export export|import <failas.csv|.ndjson[.gz]>")
+        sys.exit(1)
+
+    command, file_path = sys.argv[1:]
+    with Database() as database:
+        if command == "export":
+            print(f"✓ Eksportuota eilučių: {export_products(database, file_path)}")
+        else:
+            print(f"✓ Importuota eilučių: {import_products(database, file_path)}")
@@ -0,0 +1,246 @@
+import os
+import sqlite3
+from collections import namedtuple
+
+BACKFILL_BATCH_SIZE = 5000
+
+# apply(conn) vykdomas vienoje transakcijoje.
+# backfill - SQL su dviem parametrais (nuo_id, iki_id], vykdomas Product id intervalais po vieną
+# transakciją; progresas saugomas MigrationProgress lentelėje, todėl nutrūkus tęsiama nuo ten pat.
+Migration = namedtuple("Migration", ["version", "apply", "backfill"])
+
+
+# DailySummary keitimai; {day} ir {name} - SQL išraiškos (trigeriuose new./old., Python'e parametrai)
+SUMMARY_ADD = """
+    INSERT INTO DailySummary (day, product_name, count) SELECT {day}, {name}, 1 WHERE {day} IS NOT NULL
+    ON CONFLICT (day, product_name) DO UPDATE SET count = count + 1
+"""
+SUMMARY_REMOVE = """
+    UPDATE DailySummary SET count = count - 1 WHERE day = {day} AND product_name = {name}
+"""
+SUMMARY_CLEANUP = "DELETE FROM DailySummary WHERE count <= 0"
+SUMMARY_BACKFILL = """
+    INSERT INTO DailySummary (day, product_name, count)
+    SELECT date(created_at), product_name, COUNT(*) FROM {source}
+    WHERE {where} AND date(created_at) IS NOT NULL
+    GROUP BY 1, 2
+    ON CONFLICT (day, product_name) DO UPDATE SET count = count + excluded.count
+"""
+
+
+def _create_product_table(conn):
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS Product (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        product_name TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+
+
+def _index_created_at(conn):
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_product_created_at ON Product (created_at)')
+
+
+def _index_product_name(conn):
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_product_name_created_at ON Product (product_name, created_at)')
+
+
+def _create_search_table(conn):
+    # remove_diacritics 2: "cepelinai" randa ir "Cepelinai", "košė" - "kose"
+    conn.execute('''
+    CREATE VIRTUAL TABLE IF NOT EXISTS ProductSearch USING fts5(
+        product_name,
+        content='Product',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    ''')
+    conn.execute('''
+    CREATE TRIGGER IF NOT EXISTS product_search_insert AFTER INSERT ON Product BEGIN
+        INSERT INTO ProductSearch (rowid, product_name) VALUES (new.id, new.product_name);
+    END
+    ''')
+    conn.execute('''
+    CREATE TRIGGER IF NOT EXISTS product_search_delete AFTER DELETE ON Product BEGIN
+        INSERT INTO ProductSearch (ProductSearch, rowid, product_name) VALUES ('delete', old.id, old.product_name);
+    END
+    ''')
+    conn.execute('''
+    CREATE TRIGGER IF NOT EXISTS product_search_update AFTER UPDATE OF product_name ON Product BEGIN
+        INSERT INTO ProductSearch (ProductSearch, rowid, product_name) VALUES ('delete', old.id, old.product_name);
+        INSERT INTO ProductSearch (rowid, product_name) VALUES (new.id, new.product_name);
+    END
+    ''')
+
+
+def _create_search_index(conn):
+    # Kuriama iš naujo, kad backfill nesudubliuotų jau suindeksuotų eilučių
+    for trigger in ("product_search_insert", "product_search_delete", "product_search_update"):
+        conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    conn.execute("DROP TABLE IF EXISTS ProductSearch")
+    _create_search_table(conn)
+
+
+def _create_archive_table(conn):
+    # Archyvų failai su senesnėmis Product eilutėmis; start/end - periodas [start, end)
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS Archive (
+        name TEXT PRIMARY KEY,
+        file TEXT NOT NULL,
+        start TEXT NOT NULL,
+        end TEXT NOT NULL
+    )
+    ''')
+
+
+def create_archive_schema(conn):
+    # Archyvo faile ta pati Product struktūra ir indeksai kaip pagrindinėje DB
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS Product (
+        id INTEGER PRIMARY KEY,
+        product_name TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    _index_created_at(conn)
+    _index_product_name(conn)
+    # Savas paieškos indeksas, nes perkeliant eilutes pagrindinio ProductSearch įrašai ištrinami
+    indexed = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'ProductSearch'").fetchone()
+    _create_search_table(conn)
+    if indexed is None:
+        conn.execute("INSERT INTO ProductSearch (ProductSearch) VALUES ('rebuild')")
+
+
+def _index_archives(conn):
+    # Jau sukurtiems archyvų failams pridedamas ProductSearch
+    directory = os.path.dirname(conn.execute("PRAGMA database_list").fetchone()[2])
+    for (file_name,) in conn.execute("SELECT file FROM Archive").fetchall():
+        archive = sqlite3.connect(os.path.join(directory, file_name))
+        try:
+            with archive:
+                create_archive_schema(archive)
+        finally:
+            archive.close()
+
+
+def _create_import_progress_table(conn):
+    # Kiek eilučių iš importo failo jau įrašyta; atnaujinama kartu su kiekvienu paketu
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS ImportProgress (
+        source TEXT PRIMARY KEY,
+        rows_done INTEGER NOT NULL
+    )
+    ''')
+
+
+def _create_daily_summary(conn):
+    # Kiek kartų patiekalas valgytas kiekvieną dieną; palaikoma trigeriais ant Product
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS DailySummary (
+        day TEXT NOT NULL,
+        product_name TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (day, product_name)
+    ) WITHOUT ROWID
+    ''')
+    conn.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS daily_summary_insert AFTER INSERT ON Product BEGIN
+        {SUMMARY_ADD.format(day="date(new.created_at)", name="new.product_name")};
+    END
+    ''')
+    conn.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS daily_summary_delete AFTER DELETE ON Product
+    WHEN date(old.created_at) IS NOT NULL BEGIN
+        {SUMMARY_REMOVE.format(day="date(old.created_at)", name="old.product_name")};
+        {SUMMARY_CLEANUP};
+    END
+    ''')
+    conn.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS daily_summary_update AFTER UPDATE OF product_name, created_at ON Product BEGIN
+        {SUMMARY_REMOVE.format(day="date(old.created_at)", name="old.product_name")};
+        {SUMMARY_CLEANUP};
+        {SUMMARY_ADD.format(day="date(new.created_at)", name="new.product_name")};
+    END
+    ''')
+
+
+MIGRATIONS = [
+    Migration(1, _create_product_table, None),
+    Migration(2, _index_created_at, None),
+    Migration(3, _index_product_name, None),
+    Migration(4, _create_search_index, '''
+        INSERT INTO ProductSearch (rowid, product_name)
+        SELECT id, product_name FROM Product WHERE id > ? AND id <= ?
+    '''),
+    Migration(5, _create_archive_table, None),
+    Migration(6, _create_import_progress_table, None),
+    Migration(7, _create_daily_summary, SUMMARY_BACKFILL.format(source="Product", where="id > ? AND id <= ?")),
+    Migration(8, _index_archives, None),
+]
+
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def _set_version(conn, version):
+    conn.execute(f"PRAGMA user_version = {int(version)}")
+
+
+def migrate(db, migrations=MIGRATIONS, batch_size=BACKFILL_BATCH_SIZE):
+    conn = db._connection()
+    with db.transaction():
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS MigrationProgress (
+            version INTEGER PRIMARY KEY,
+            last_id INTEGER NOT NULL,
+            upto_id INTEGER NOT NULL
+        )
+        ''')
+
+    for migration in sorted(migrations, key=lambda m: m.version):
+        if migration.version <= schema_version(conn):
+            continue
+        if migration.backfill is None:
+            with db.transaction():
+                migration.apply(conn)
+                _set_version(conn, migration.version)
+        else:
+            _migrate_in_batches(db, conn, migration, batch_size)
+
+
+def _migrate_in_batches(db, conn, migration, batch_size):
+    progress = conn.execute(
+        "SELECT last_id, upto_id FROM MigrationProgress WHERE version = ?", (migration.version,)
+    ).fetchone()
+
+    if progress is None:
+        with db.transaction():
+            migration.apply(conn)
+            # Naujesnes eilutes jau tvarko apply() sukurti trigeriai
+            upto_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM Product").fetchone()[0]
+            conn.execute(
+                "INSERT INTO MigrationProgress (version, last_id, upto_id) VALUES (?, 0, ?)",
+                (migration.version, upto_id)
+            )
+        last_id = 0
+    else:
+        last_id, upto_id = progress
+
+    while last_id < upto_id:
+        with db.transaction():
+            boundary = conn.execute(
+                "SELECT id FROM Product WHERE id > ? AND id <= ? ORDER BY id LIMIT 1 OFFSET ?",
+                (last_id, upto_id, batch_size - 1)
+            ).fetchone()
+            next_id = boundary[0] if boundary else upto_id
+            conn.execute(migration.backfill, (last_id, next_id))
+            conn.execute(
+                "UPDATE MigrationProgress SET last_id = ? WHERE version = ?", (next_id, migration.version)
+            )
+        last_id = next_id
+
+    with db.transaction():
+        conn.execute("DELETE FROM MigrationProgress WHERE version = ?", (migration.version,))
+        _set_version(conn, migration.version)
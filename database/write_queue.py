@@ -0,0 +1,115 @@
+import queue
+import threading
+from concurrent.futures import Future
+
+WRITE_BATCH_SIZE = 100
+
+# Database metodai, kuriuos galima vykdyti rašymo gijoje
+WRITE_OPERATIONS = {
+    "add_product",
+    "add_products",
+    "update_product",
+    "delete_product",
+    "delete_all_products",
+}
+
+# Operacijos, kurių pirmas argumentas - product_id, galintis būti archyve
+ARCHIVE_EDITS = {"update_product", "delete_product"}
+
+_STOP = object()
+
+
+def _call_directly(fn):
+    fn()
+
+
+class WriteQueue:
+    # Viena rašymo gija: surenka eilėje laukiančias operacijas ir jas įrašo vienu commit
+
+    def __init__(self, db, dispatch=None, batch_size=WRITE_BATCH_SIZE):
+        self.db = db
+        # dispatch(fn) nusprendžia, kurioje gijoje kviesti callback (pvz. per kivy Clock)
+        self.dispatch = dispatch or _call_directly
+        self.batch_size = batch_size
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, operation, *args, callback=None):
+        if operation not in WRITE_OPERATIONS:
+            raise ValueError(f"Nežinoma rašymo operacija: {operation}")
+
+        future = Future()
+        if callback is not None:
+            future.add_done_callback(lambda f: self.dispatch(lambda: callback(f)))
+
+        self._ensure_started()
+        self._queue.put((operation, args, future))
+        return future
+
+    def flush(self, timeout=None):
+        # Laukia, kol bus įrašytos visos iki šiol pateiktos operacijos
+        marker = Future()
+        self._ensure_started()
+        self._queue.put(marker)
+        marker.result(timeout)
+
+    def close(self, timeout=None):
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout)
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+                self._thread.start()
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        while len(batch) < self.batch_size and batch[-1] is not _STOP:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            stop = batch[-1] is _STOP
+            self._write_batch([item for item in batch if item is not _STOP])
+            if stop:
+                return
+
+    def _write_batch(self, batch):
+        operations = [item for item in batch if isinstance(item, tuple)]
+        results = []
+        try:
+            if operations:
+                # Archyvai prijungiami prieš transakciją, kad jų keitimai būtų atšaukiami kartu
+                product_ids = [args[0] for operation, args, _ in operations if operation in ARCHIVE_EDITS]
+                with self.db.transaction(self.db.archives_for(product_ids)):
+                    for operation, args, _ in operations:
+                        try:
+                            with self.db.savepoint():
+                                results.append((getattr(self.db, operation)(*args), None))
+                        except Exception as e:
+                            results.append((None, e))
+        except Exception as e:
+            # Nepavyko commit - visos paketo operacijos laikomos nepavykusiomis
+            results = [(None, e)] * len(operations)
+
+        for (_, _, future), (result, error) in zip(operations, results):
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+        # flush() žymekliai
+        for item in batch:
+            if isinstance(item, Future):
+                item.set_result(None)
@@ -0,0 +1,147 @@
+import math
+import threading
+from collections import Counter, defaultdict
+
+from dishExtractor import fold
+
+# Dice panašumas pagal trigramas: "Cepelinai su kiaulienos" ~ "Cepelinai su kiauliena" = 0.89,
+# o skirtingi patiekalai ("Koldūnai su grietine" / "su sviestu") ~ 0.6
+SIMILARITY_THRESHOLD = 0.8
+# Kiek bendrų prefikso trigramų reikalaujama iš kandidato; didesnis - mažiau kandidatų tikrinti
+PREFIX_HITS = 3
+
+
+def normalize_name(name):
+    return " ".join(fold(name).split())
+
+
+def trigrams(key):
+    padded = f"  {key} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class DishCanonicalizer:
+    # Trigramų indeksas per jau išsaugotus product_name: naujas pavadinimas pakeičiamas
+    # artimiausiu esamu, jei jie pakankamai panašūs
+
+    def __init__(self, names=(), threshold=SIMILARITY_THRESHOLD):
+        self.threshold = threshold
+        self._canonical = {}
+        # Retesni rašybos variantai susiejami su dažnesniu tik pirmą kartą į juos pataikius
+        self._resolved = set()
+        self._rank = {}
+        # Trigramų aibė kaip bitų kaukė: bendrų trigramų skaičius - (a & b).bit_count()
+        self._masks = {}
+        self._sizes = {}
+        self._gram_ids = {}
+        # Bendra trigramų tvarka (rečiausios pirmos); kartą priskirta nebesikeičia
+        self._order = {}
+        self._postings = defaultdict(set)
+        self._lock = threading.Lock()
+        self.add_all(names)
+
+    @classmethod
+    def from_database(cls, db, threshold=SIMILARITY_THRESHOLD):
+        # Dažniausias rašybos variantas pridedamas pirmas ir tampa kanoniniu
+        return cls([name for name, _ in db.dish_frequency()], threshold)
+
+    def __len__(self):
+        return len(self._canonical)
+
+    def add(self, name):
+        name = name.strip()
+        key = normalize_name(name)
+        if not key:
+            return
+        with self._lock:
+            if key in self._canonical:
+                return
+            grams = trigrams(key)
+            mask = 0
+            for gram in grams:
+                gram_id = self._gram_ids.setdefault(gram, len(self._gram_ids))
+                self._order.setdefault(gram, (1, gram_id))
+                mask |= 1 << gram_id
+            # Indeksuojamas tik prefiksas, žr. _best_match
+            for gram in self._prefix(grams):
+                self._postings[gram].add(key)
+            self._canonical[key] = name
+            self._rank[key] = len(self._rank)
+            self._masks[key] = mask
+            self._sizes[key] = len(grams)
+
+    def add_all(self, names):
+        # Naujų trigramų tvarka pagal dažnį tarp names; užraktas imamas kiekvienam pavadinimui
+        # atskirai, kad kraunant fone paieška nelauktų
+        names = list(names)
+        frequency = Counter(gram for key in {normalize_name(name) for name in names} for gram in trigrams(key))
+        with self._lock:
+            for gram, count in frequency.items():
+                gram_id = self._gram_ids.setdefault(gram, len(self._gram_ids))
+                self._order.setdefault(gram, (count, gram_id))
+        for name in names:
+            self.add(name)
+
+    def canonicalize(self, name):
+        key = normalize_name(name)
+        if not key:
+            return name
+        with self._lock:
+            if key not in self._canonical:
+                key = self._best_match(trigrams(key))
+                if key is None:
+                    return name.strip()
+            return self._resolve(key)
+
+    def canonicalize_all(self, names):
+        return [self.canonicalize(name) for name in names]
+
+    def _resolve(self, key):
+        # Kanoninis key pavadinimas: artimiausias už jį dažnesnis variantas, jei toks yra
+        if key not in self._resolved:
+            self._resolved.add(key)
+            more_frequent = self._best_match(trigrams(key), before=self._rank[key])
+            if more_frequent is not None:
+                self._canonical[key] = self._resolve(more_frequent)
+        return self._canonical[key]
+
+    def _min_overlap(self, size):
+        # Dice >= t reikalauja bent t*|A|/(2-t) bendrų trigramų, kad ir koks būtų |B|
+        t = self.threshold
+        return max(1, math.ceil(t * size / (2 - t) - 1e-9))
+
+    def _prefix(self, grams):
+        # Jei bendrų trigramų >= min_overlap, abiejų aibių |X| - min_overlap + k pirmųjų (pagal bendrą
+        # tvarką) prefiksai turi bent k bendrų trigramų; nežinomos trigramos - gale
+        min_overlap = self._min_overlap(len(grams))
+        ordered = sorted(grams, key=lambda gram: self._order.get(gram, (math.inf,)))
+        return ordered[:len(grams) - min_overlap + min(PREFIX_HITS, min_overlap)]
+
+    def _best_match(self, grams, before=None):
+        # before - tik pavadinimai, pridėti anksčiau (dažnesni)
+        t = self.threshold
+        size = len(grams)
+        hits = Counter()
+        for gram in self._prefix(grams):
+            hits.update(self._postings.get(gram, ()))
+        # Trumpi pavadinimai turi trumpesnį prefiksą, todėl reikalaujama mažiausio iš abiejų k
+        required = min(PREFIX_HITS, self._min_overlap(size), self._min_overlap(math.ceil(t * size / (2 - t))))
+        candidates = [candidate for candidate, count in hits.items() if count >= required]
+
+        mask = 0
+        for gram in grams:
+            gram_id = self._gram_ids.get(gram)
+            if gram_id is not None:
+                mask |= 1 << gram_id
+
+        # Vienodo panašumo atveju laimi anksčiau pridėtas (dažnesnis) pavadinimas
+        masks, sizes, ranks = self._masks, self._sizes, self._rank
+        best, best_score, best_rank = None, t, None
+        for candidate in candidates:
+            rank = ranks[candidate]
+            if before is not None and rank >= before:
+                continue
+            score = 2 * (mask & masks[candidate]).bit_count() / (size + sizes[candidate])
+            if score > best_score or (score == best_score and (best is None or rank < best_rank)):
+                best, best_score, best_rank = candidate, score, rank
+        return best
@@ -0,0 +1,126 @@
+import re
+import unicodedata
+
+# Patiekalas -> jo pavadinimai (lietuviškai ir angliškai); linksniai atpažįstami pagal kamieną
+DISH_LEXICON = {
+    "Cepelinai": ["cepelinai", "didžkukuliai", "zeppelins"],
+    "Šaltibarščiai": ["šaltibarščiai", "cold beetroot soup"],
+    "Barščiai": ["barščiai", "borscht"],
+    "Sriuba": ["sriuba", "soup"],
+    "Vištienos sriuba": ["vištienos sriuba", "chicken soup"],
+    "Kugelis": ["kugelis", "bulvių plokštainis"],
+    "Koldūnai": ["koldūnai", "dumplings"],
+    "Virtiniai": ["virtiniai"],
+    "Balandėliai": ["balandėliai", "cabbage rolls"],
+    "Blynai": ["blynai", "blyneliai", "pancakes"],
+    "Žemaičių blynai": ["žemaičių blynai"],
+    "Varškėčiai": ["varškėčiai"],
+    "Košė": ["košė", "porridge"],
+    "Avižinė košė": ["avižinė košė", "oatmeal"],
+    "Bulvių košė": ["bulvių košė", "mashed potatoes"],
+    "Pica": ["pica", "pizza"],
+    "Kebabas": ["kebabas", "kebab"],
+    "Mėsainis": ["mėsainis", "burger", "hamburger"],
+    "Omletas": ["omletas", "omelette"],
+    "Kiaušinienė": ["kiaušinienė", "scrambled eggs"],
+    "Salotos": ["salotos", "salad"],
+    "Makaronai": ["makaronai", "pasta"],
+    "Spagečiai": ["spagečiai", "spaghetti"],
+    "Lazanija": ["lazanija", "lasagna"],
+    "Ryžiai": ["ryžiai", "rice"],
+    "Plovas": ["plovas"],
+    "Sušiai": ["sušiai", "sushi"],
+    "Sumuštinis": ["sumuštinis", "sandwich"],
+    "Kepsnys": ["kepsnys", "steak"],
+    "Karbonadas": ["karbonadas"],
+    "Kotletai": ["kotletai", "kotletas"],
+    "Jogurtas": ["jogurtas", "yogurt"],
+    "Duona": ["duona", "bread"],
+    "Kruasanas": ["kruasanas", "croissant"],
+    "Pyragas": ["pyragas", "pie"],
+    "Tortas": ["tortas", "cake"],
+    "Obuolys": ["obuolys", "apple"],
+    "Bananas": ["bananas", "banana"],
+}
+
+# Žodžiai, kurie nekeičia patiekalų sąrašo; bet koks kitas žodis reiškia, kad sakinys per sudėtingas
+FILLER_WORDS = [
+    "valgiau", "suvalgiau", "valgėm", "valgėme", "pavalgiau", "buvo", "turėjau", "aš", "man",
+    "pusryčiams", "pietums", "vakarienei", "priešpiečiams", "užkandžiui", "pietus", "pusryčius", "vakarienę",
+    "šiandien", "vakar", "ryte", "vakare", "dieną", "per", "ir", "bei", "dar", "taip", "pat", "tik",
+    "i", "ate", "had", "eaten", "for", "breakfast", "lunch", "dinner", "and", "some", "a", "today", "yesterday",
+]
+
+# Lietuviškos galūnės (be diakritikų), ilgesnės tikrinamos pirmiau
+ENDINGS = sorted([
+    "iais", "uose", "emis", "omis", "iams", "ioms", "ams", "oms", "ais", "ius", "ies", "ose", "ese",
+    "ums", "iai", "iu", "io", "ui", "us", "as", "is", "ys", "ai", "os", "es", "ei", "ia", "ie",
+    "a", "e", "i", "u", "o", "y", "s",
+], key=len, reverse=True)
+MIN_STEM = 3
+
+_WORD = re.compile(r"\w+")
+
+
+def fold(text):
+    # "Košę" -> "kose": atpažįstama ir be diakritikų
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def stem(word):
+    for ending in ENDINGS:
+        if word.endswith(ending) and len(word) - len(ending) >= MIN_STEM:
+            return word[:-len(ending)]
+    return word
+
+
+def stems(text):
+    return [stem(word) for word in _WORD.findall(fold(text))]
+
+
+class DishExtractor:
+    # Žodžių kamienų medis (trie): ilgiausias atitikmuo nuo kiekvieno žodžio
+
+    def __init__(self, lexicon=DISH_LEXICON, filler_words=FILLER_WORDS):
+        self._root = {}
+        for dish, names in lexicon.items():
+            for name in names:
+                node = self._root
+                for word_stem in stems(name):
+                    node = node.setdefault(word_stem, {})
+                node[None] = dish
+        self._filler = {word_stem for word in filler_words for word_stem in stems(word)}
+
+    def extract(self, text):
+        # Patiekalų sąrašas arba None, kai tekste yra neatpažintų žodžių ar patiekalų nerasta
+        words = stems(text)
+        dishes = []
+        i = 0
+        while i < len(words):
+            node, match, end = self._root, None, i
+            for j in range(i, len(words)):
+                node = node.get(words[j])
+                if node is None:
+                    break
+                if None in node:
+                    match, end = node[None], j + 1
+            if match is not None:
+                if match not in dishes:
+                    dishes.append(match)
+                i = end
+            elif words[i] in self._filler:
+                i += 1
+            else:
+                return None
+        return dishes or None
+
+
+_default = None
+
+
+def extract_dishes(text):
+    global _default
+    if _default is None:
+        _default = DishExtractor()
+    return _default.extract(text)
@@ -0,0 +1,78 @@
+import json
+import re
+
+PREFIX = "- Patiekalas:"
+
+# Viena "- Patiekalas: pavadinimas" eilutė; visas tekstas perbėgamas vienu findall.
+# (?:^|\n) vietoj re.MULTILINE ir godus [^\n]* su rstrip() - keletą kartų greičiau už ^...(.*?)\s*$
+_DISH_LINE = re.compile(r"(?:^|\n)[ \t]*- Patiekalas:[ \t]*([^\n]*)")
+
+
+class Dish:
+    # Vienas atpažintas patiekalas; __slots__, nes atsakyme jų gali būti daug
+
+    __slots__ = ("id", "name")
+
+    def __init__(self, id, name):
+        self.id = id
+        self.name = name
+
+    def __eq__(self, other):
+        return isinstance(other, Dish) and (self.id, self.name) == (other.id, other.name)
+
+    def __repr__(self):
+        return f"Dish({self.id!r}, {self.name!r})"
+
+
+def parse_dish_names(text):
+    # JSON režimas: ["...", ...] arba {"dishes": [...]}; kitaip - "- Patiekalas:" eilutės
+    stripped = text.lstrip()
+    if stripped[:1] in ("[", "{"):
+        names = _json_names(stripped)
+        if names is not None:
+            return names
+    return [name for name in map(str.rstrip, _DISH_LINE.findall(text)) if name]
+
+
+def parse_dishes(text):
+    names = parse_dish_names(text)
+    return list(map(Dish, range(1, len(names) + 1), names))
+
+
+def parse_line(line):
+    # Vienos eilutės patiekalas arba None
+    match = _DISH_LINE.match(line)
+    return (match.group(1).rstrip() or None) if match else None
+
+
+def format_dishes(names):
+    return "\n".join(f"{PREFIX} {name}" for name in names)
+
+
+def _json_names(text):
+    try:
+        result = json.loads(text)
+    except ValueError:
+        return None
+    if isinstance(result, dict):
+        result = result.get("dishes")
+    if not isinstance(result, list):
+        return None
+    return [item.strip() for item in result if isinstance(item, str) and item.strip()]
+
+
+class DishLineParser:
+    # Renka teksto gabalus ir grąžina patiekalus, kai tik jų eilutė baigta
+
+    def __init__(self):
+        self._buffer = ""
+
+    def feed(self, chunk):
+        self._buffer += chunk
+        *lines, self._buffer = self._buffer.split("\n")
+        return [dish for dish in map(parse_line, lines) if dish]
+
+    def close(self):
+        line, self._buffer = self._buffer, ""
+        dish = parse_line(line)
+        return [dish] if dish else []
@@ -0,0 +1,75 @@
+import os
+
+from llmResilience import CircuitBreaker
+from rateLimiter import get_limiter
+
+GROQ_URL = "https://api.groq.com/openai/v1/chat/completions"
+GROQ_MODEL = "llama-3.3-70b-versatile"
+LOCAL_URL = "http://127.0.0.1:8765/v1/chat/completions"
+LOCAL_MODEL = "stand-in"
+
+
+class OpenAICompatibleBackend:
+    # Bet koks /v1/chat/completions serveris (OpenAI, vLLM, llama.cpp, Ollama ir pan.)
+
+    name = "openai"
+
+    def __init__(self, url, model, api_key=None, rate_limiter=None):
+        self.url = url
+        self.model = model
+        self.api_key = api_key
+        # rateLimiter.RateLimiter arba None, jei serveris ribų neturi
+        self.rate_limiter = rate_limiter
+        self.breaker = CircuitBreaker()
+
+    def headers(self):
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        return headers
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.url!r}, {self.model!r})"
+
+
+class GroqBackend(OpenAICompatibleBackend):
+    name = "groq"
+
+    def __init__(self, api_key=None, model=GROQ_MODEL, url=GROQ_URL):
+        super().__init__(url, model, api_key if api_key is not None else os.getenv("API_KEY"), get_limiter("llm"))
+
+    def headers(self):
+        # Groq visada gauna Authorization, net jei raktas nenustatytas - tada grąžina aiškią 401 klaidą
+        return {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
+
+
+class LocalBackend(OpenAICompatibleBackend):
+    # llmStandIn.py serveris: įrašyti atsakymai be tinklo, apkrovos testams
+    name = "local"
+
+    def __init__(self, url=LOCAL_URL, model=LOCAL_MODEL):
+        super().__init__(url, model)
+
+
+def backend_from_env():
+    # LLM_BACKEND=groq|openai|local; openai atveju LLM_BASE_URL, LLM_MODEL ir LLM_API_KEY
+    kind = os.getenv("LLM_BACKEND", "groq")
+    if kind == "groq":
+        return GroqBackend(model=os.getenv("LLM_MODEL", GROQ_MODEL))
+    if kind == "local":
+        return LocalBackend(os.getenv("LLM_BASE_URL", LOCAL_URL))
+    if kind == "openai":
+        url = os.getenv("LLM_BASE_URL")
+        model = os.getenv("LLM_MODEL")
+        if not url or not model:
+            raise ValueError("LLM_BACKEND=openai reikalauja LLM_BASE_URL ir LLM_MODEL")
+        return OpenAICompatibleBackend(url, model, os.getenv("LLM_API_KEY"))
+    raise ValueError(f"Nežinomas LLM_BACKEND: {kind}")
+
+
+def fallback_from_env():
+    # Atsarginis serveris, kai pagrindinio grandinė atjungta: LLM_FALLBACK_URL, LLM_FALLBACK_MODEL, LLM_FALLBACK_API_KEY
+    url = os.getenv("LLM_FALLBACK_URL")
+    if not url:
+        return None
+    return OpenAICompatibleBackend(url, os.getenv("LLM_FALLBACK_MODEL", GROQ_MODEL), os.getenv("LLM_FALLBACK_API_KEY"))
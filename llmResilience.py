@@ -0,0 +1,119 @@
+import bisect
+import threading
+import time
+from collections import deque
+
+# Histogramos ribos sekundėmis: nuo 10 ms iki ~2 min, kiekviena 25 % didesnė už ankstesnę
+LATENCY_BUCKETS = [0.01 * 1.25 ** i for i in range(43)]
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class LatencyHistogram:
+    # Sėkmingų užklausų trukmės; pagal p95 nusprendžiama, kada siųsti dubliuojančią užklausą
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = list(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+            self.count += 1
+            self.total += seconds
+
+    def percentile(self, q):
+        # Viršutinė krepšelio riba; None, kol nėra matavimų
+        with self._lock:
+            if not self.count:
+                return None
+            rank = q * self.count
+            seen = 0
+            for index, count in enumerate(self.counts):
+                seen += count
+                if seen >= rank and count:
+                    return self.buckets[index] if index < len(self.buckets) else self.buckets[-1]
+            return self.buckets[-1]
+
+    def snapshot(self):
+        with self._lock:
+            buckets = [(bound, count) for bound, count in zip(self.buckets + [float("inf")], self.counts) if count]
+            count, total = self.count, self.total
+        return {
+            "count": count,
+            "mean": total / count if count else None,
+            "p50": self.percentile(0.50),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "buckets": buckets,
+        }
+
+
+class CircuitBreaker:
+    # Kai paskutinėse window užklausose klaidų dalis >= error_rate, open_seconds laikotarpiui
+    # užklausos nebesiunčiamos; po to praleidžiama viena bandomoji (half-open)
+
+    def __init__(self, window=20, min_requests=5, error_rate=0.5, open_seconds=30.0):
+        self.window = window
+        self.min_requests = min_requests
+        self.error_rate = error_rate
+        self.open_seconds = open_seconds
+        self.state = CLOSED
+        self._outcomes = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+                self.state = HALF_OPEN
+                self._probing = False
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record(self, success):
+        with self._lock:
+            if self.state == HALF_OPEN:
+                if success:
+                    self.state = CLOSED
+                    self._outcomes.clear()
+                else:
+                    self._open()
+                return
+            self._outcomes.append(success)
+            failures = self._outcomes.count(False)
+            if len(self._outcomes) >= self.min_requests and failures / len(self._outcomes) >= self.error_rate:
+                self._open()
+
+    def release(self):
+        # Bandymas baigėsi nei sėkme, nei serverio klaida (pvz. vietinis ribojimas) - kitas gali bandyti
+        with self._lock:
+            self._probing = False
+
+    def _open(self):
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self._probing = False
+
+    def stats(self):
+        with self._lock:
+            failures = self._outcomes.count(False)
+            return {
+                "state": self.state,
+                "requests": len(self._outcomes),
+                "error_rate": failures / len(self._outcomes) if self._outcomes else 0.0,
+            }
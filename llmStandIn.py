@@ -0,0 +1,169 @@
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from dishExtractor import extract_dishes
+from dishParser import format_dishes, parse_dish_names
+from responseCache import normalize_query
+
+DEFAULT_PORT = 8765
+
+# Įrašyti atsakymai: transkripcija -> LLM atsakymas
+RECORDINGS = {
+    "Šiandien vakare valgiau kebabą su česnakiniu padažu. Ryte, atsikėlęs valgiau cepelinus su kiauliena.":
+        "- Patiekalas: Kebabas su česnakiniu padažu\n- Patiekalas: Cepelinai su kiauliena",
+    "valgiau koldūnus su grietine ir pica su saliamiu":
+        "- Patiekalas: Koldūnai su grietine\n- Patiekalas: Pica su saliamiu",
+    "Pusryčiams valgiau košę su uogomis":
+        "- Patiekalas: Košė su uogomis",
+    "Šiandien žiūrėjau filmą ir klausiau muzikos":
+        "None",
+}
+
+_INPUT = re.compile(r"---INPUT---\n(.*?)\n---END INPUT---", re.DOTALL)
+_BATCH_ITEM = re.compile(r"^\[(\d+)\] (.*)$", re.MULTILINE)
+
+
+class StandInServer(ThreadingHTTPServer):
+    # OpenAI suderinamas /v1/chat/completions be tinklo: atsakymai iš įrašų, su vėlavimu ir klaidomis
+
+    daemon_threads = True
+
+    def __init__(self, port=DEFAULT_PORT, recordings=None, latency=0.0, jitter=0.0, error_rate=0.0,
+                 error_status=503, seed=None, host="127.0.0.1"):
+        super().__init__((host, port), _Handler)
+        recordings = RECORDINGS if recordings is None else recordings
+        self.recordings = {normalize_query(query): text for query, text in recordings.items()}
+        self._replay = [text for text in recordings.values() if parse_dish_names(text)]
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.requests = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1/chat/completions"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name="llm-stand-in", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def next_delay_and_error(self):
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            failed = self._random.random() < self.error_rate
+            if failed:
+                self.errors += 1
+        return delay, failed
+
+    def answer(self, query):
+        # Neįrašytam tekstui - vietinis atpažinimas, o jei ir jis nepadeda, vienas iš įrašų pagal teksto hash
+        key = normalize_query(query)
+        text = self.recordings.get(key)
+        if text is not None:
+            return text
+        dishes = extract_dishes(query)
+        if dishes or not self._replay:
+            return format_dishes(dishes or [])
+        return self._replay[zlib.crc32(key.encode("utf-8")) % len(self._replay)]
+
+    def answer_prompt(self, prompt, json_output):
+        match = _INPUT.search(prompt)
+        transcript = match.group(1) if match else prompt
+        if not json_output:
+            return self.answer(transcript)
+        answers = {index: parse_dish_names(self.answer(text)) for index, text in _BATCH_ITEM.findall(transcript)}
+        return json.dumps(answers, ensure_ascii=False)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # keep-alive, kaip tikrame API; be Nagle, kitaip antraštės ir turinys vėluoja ~40 ms
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        delay, failed = self.server.next_delay_and_error()
+        time.sleep(delay)
+
+        if failed:
+            self._send_json(self.server.error_status, {"error": {"message": "stand-in: injected error"}},
+                            {"Retry-After": "0"})
+            return
+
+        prompt = body.get("messages", [{}])[-1].get("content", "")
+        content = self.server.answer_prompt(prompt, "response_format" in body)
+        if body.get("stream"):
+            self._send_stream(content)
+        else:
+            self._send_json(200, {
+                "model": body.get("model"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}}],
+            })
+
+    def _send_json(self, status, payload, headers=None):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, content):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        # Po vieną žodį, kaip tokenus
+        for token in re.findall(r"\S+\s*", content):
+            chunk = {"choices": [{"index": 0, "delta": {"content": token}}]}
+            self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+        self.wfile.write(b"data: [DONE]\n\n")
+
+    def log_message(self, format, *args):
+        pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vietinis LLM pakaitalas apkrovos testams")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--recordings", help="JSON failas {transkripcija: atsakymas}")
+    parser.add_argument("--latency", type=float, default=0.0, help="vėlavimas sekundėmis")
+    parser.add_argument("--jitter", type=float, default=0.0, help="papildomas atsitiktinis vėlavimas")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="klaidų dalis 0..1")
+    parser.add_argument("--error-status", type=int, default=503)
+    args = parser.parse_args()
+
+    recordings = None
+    if args.recordings:
+        with open(args.recordings, encoding="utf-8") as f:
+            recordings = json.load(f)
+
+    server = StandInServer(args.port, recordings, args.latency, args.jitter, args.error_rate, args.error_status)
+    print(f"LLM pakaitalas: {server.url} (LLM_BACKEND=local)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
@@ -0,0 +1,190 @@
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database.database import Database, TIMESTAMP_FORMAT, day_range, month_range  # noqa: E402
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+DEFAULT_REPEAT = 20
+HISTORY_YEARS = 3
+
+DISHES = [
+    "Cepelinai su kiauliena", "Šaltibarščiai", "Kebabas su česnakiniu padažu",
+    "Koldūnai su grietine", "Pica su saliamiu", "Košė su uogomis", "Balandėliai",
+    "Kugelis", "Vištienos sriuba", "Blynai su varške", "Kepsnys su bulvėmis",
+    "Makaronai su sūriu", "Salotos su tunu", "Omletas", "Žemaičių blynai",
+]
+
+
+def _utc_now():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def generate_products(db, count, years=HISTORY_YEARS, seed=42):
+    """Fill the database with `count` synthetic rows spread over `years` years"""
+    rng = random.Random(seed)
+    now = _utc_now()
+    span = int(timedelta(days=365 * years).total_seconds())
+
+    def rows():
+        for _ in range(count):
+            created_at = now - timedelta(seconds=rng.randrange(span))
+            yield rng.choice(DISHES), created_at.strftime(TIMESTAMP_FORMAT)
+
+    db.add_products_chunked(rows(), chunk_size=10_000)
+
+
+def percentiles(samples):
+    """p50/p95/p99 of latency samples, in milliseconds"""
+    ordered = sorted(samples)
+
+    def pick(q):
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 3)
+
+    return {"p50_ms": pick(0.50), "p95_ms": pick(0.95), "p99_ms": pick(0.99)}
+
+
+def time_call(fn, repeat):
+    """Time `fn` `repeat` times, then measure peak memory of one extra traced call"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+
+    # tracemalloc lėtina vykdymą, todėl atmintis matuojama atskiru kvietimu
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = percentiles(samples)
+    result["peak_memory_kb"] = round(peak / 1024, 1)
+    return result
+
+
+def time_once(fn):
+    """Time a single traced call of a method that cannot be repeated on the same data"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = percentiles([elapsed])
+    result["peak_memory_kb"] = round(peak / 1024, 1)
+    return result
+
+
+def benchmark_methods(db, repeat):
+    """Time every public Database method against an already filled database"""
+    now = _utc_now()
+    last_month = month_range(now - timedelta(days=31))
+    newest = db.get_products_page(limit=1)[0]
+    new_ids = []
+
+    def read_snapshot_page():
+        with db.snapshot() as snap:
+            snap.get_products_page(limit=50)
+
+    reads = {
+        "get_all_products": db.get_all_products,
+        "get_products_today": db.get_products_today,
+        "get_products_this_week": db.get_products_this_week,
+        "get_products_this_month": db.get_products_this_month,
+        "get_products_between": lambda: db.get_products_between(*last_month),
+        "get_products_page": lambda: db.get_products_page(limit=50),
+        "get_products_page_keyset": lambda: db.get_products_page(newest["created_at"], newest["id"], limit=50),
+        "iter_products_first_1000": lambda: [p for _, p in zip(range(1000), db.iter_products())],
+        "search_products": lambda: db.search_products("cepel"),
+        "dish_frequency": lambda: db.dish_frequency(*last_month),
+        "count_by_period_day": lambda: db.count_by_period("day", *last_month),
+        "dish_first_last": lambda: db.dish_first_last("Kugelis"),
+        "summary_count_by_period_day": lambda: db.summary_count_by_period("day", *last_month),
+        "summary_dish_frequency": lambda: db.summary_dish_frequency(*last_month),
+        "list_archives": db.list_archives,
+        "snapshot_page": read_snapshot_page,
+    }
+    writes = {
+        "add_product": lambda: db.add_product("Benchmark"),
+        "add_products_10": lambda: new_ids.extend(db.add_products(["Benchmark"] * 10)),
+        "add_products_chunked_100": lambda: new_ids.extend(db.add_products_chunked(["Benchmark"] * 100, 10)),
+        "update_product": lambda: db.update_product(new_ids[-1], "Benchmark 2"),
+        "delete_product": lambda: db.delete_product(new_ids.pop()),
+        "rebuild_daily_summary": db.rebuild_daily_summary,
+    }
+
+    results = {}
+    for name, fn in {**reads, **writes}.items():
+        results[name] = time_call(fn, repeat)
+
+    # Be talpyklos matuojame SQL; atskirai - pakartotinis skaitymas iš talpyklos
+    db.cache.maxsize = 1
+    db.get_products_today()
+    results["get_products_today_cached"] = time_call(db.get_products_today, repeat)
+    db.cache.maxsize = 0
+    db.cache.invalidate()
+
+    today = day_range(now)
+    results["get_products_between_today"] = time_call(lambda: db.get_products_between(*today), repeat)
+
+    # Keičia visą duomenų rinkinį, todėl matuojama vieną kartą ir pačioje pabaigoje
+    results["archive_older_than"] = time_once(lambda: db.archive_older_than(now - timedelta(days=365)))
+    results["delete_all_products"] = time_once(db.delete_all_products)
+    return results
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, repeat=DEFAULT_REPEAT):
+    """Run the suite for every dataset size on a temporary data.db"""
+    report = {"created_at": _utc_now().strftime(TIMESTAMP_FORMAT), "repeat": repeat, "sizes": {}}
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, "data.db")
+            with Database(db_path, cache_size=0) as db:
+                start = time.perf_counter()
+                generate_products(db, size)
+                fill_seconds = round(time.perf_counter() - start, 2)
+                print(f"  {size} eilučių sugeneruota per {fill_seconds} s")
+
+                report["sizes"][str(size)] = {
+                    "fill_seconds": fill_seconds,
+                    "methods": benchmark_methods(db, repeat),
+                }
+    return report
+
+
+def generate_json_report(report, output_file='benchmark_database.json'):
+    """Write benchmark results as JSON so runs can be compared"""
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"✓ Rezultatai išsaugoti: {output_file}")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    output_file = 'benchmark_database.json'
+    if "--output" in args:
+        index = args.index("--output")
+        output_file = args[index + 1]
+        del args[index:index + 2]
+
+    sizes = [int(arg) for arg in args] or DEFAULT_SIZES
+    print(f"Matuojama su {sizes} eilučių...\n")
+
+    report = run_benchmarks(sizes)
+    generate_json_report(report, output_file)
+
+    for size, data in report["sizes"].items():
+        print(f"\n{size} eilučių:")
+        for name, result in data["methods"].items():
+            print(f"  {name:32} p50={result['p50_ms']:>9} ms  p95={result['p95_ms']:>9} ms  "
+                  f"p99={result['p99_ms']:>9} ms  mem={result['peak_memory_kb']} KB")
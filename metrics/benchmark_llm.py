@@ -0,0 +1,79 @@
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import LLM  # noqa: E402
+from llmBackends import LocalBackend  # noqa: E402
+from llmStandIn import RECORDINGS, StandInServer  # noqa: E402
+from metrics.benchmark_database import generate_json_report, percentiles  # noqa: E402
+from responseCache import ResponseCache  # noqa: E402
+
+DEFAULT_CONCURRENCY = [1, 4, 16]
+DEFAULT_REQUESTS = 200
+
+
+def generate_queries(count):
+    """Distinct transcripts, so neither the cache nor the local extractor answers them locally"""
+    texts = [query for query, text in RECORDINGS.items() if "Patiekalas" in text]
+    return [f"{texts[i % len(texts)]} ({i})" for i in range(count)]
+
+
+def run_benchmarks(concurrency_levels=DEFAULT_CONCURRENCY, requests_count=DEFAULT_REQUESTS,
+                   latency=0.05, error_rate=0.0):
+    """send_query/send_queries throughput against the local stand-in server"""
+    report = {"latency": latency, "error_rate": error_rate, "requests": requests_count, "concurrency": {}}
+    server = StandInServer(port=0, latency=latency, error_rate=error_rate, seed=42).start()
+    previous = LLM.get_backend()
+    LLM.set_backend(LocalBackend(server.url))
+    try:
+        for concurrency in concurrency_levels:
+            with tempfile.TemporaryDirectory() as tmp:
+                cache = ResponseCache(f"{tmp}/cache.db")
+                with mock.patch.object(LLM, "_response_cache", cache):
+                    queries = generate_queries(requests_count)
+                    samples = []
+
+                    def timed(query):
+                        start = time.perf_counter()
+                        result = LLM.send_query(query)
+                        samples.append(time.perf_counter() - start)
+                        return result
+
+                    start = time.perf_counter()
+                    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                        results = list(executor.map(timed, queries))
+                    elapsed = time.perf_counter() - start
+                cache.close()
+
+            errors = sum(1 for result in results if result.startswith("Klaida"))
+            report["concurrency"][str(concurrency)] = {
+                "requests_per_second": round(len(queries) / elapsed, 1),
+                "errors": errors,
+                **percentiles(samples),
+            }
+    finally:
+        LLM.set_backend(previous)
+        server.stop()
+    return report
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    output_file = 'benchmark_llm.json'
+    if "--output" in args:
+        index = args.index("--output")
+        output_file = args[index + 1]
+        del args[index:index + 2]
+
+    levels = [int(arg) for arg in args] or DEFAULT_CONCURRENCY
+    report = run_benchmarks(levels)
+    generate_json_report(report, output_file)
+
+    for concurrency, result in report["concurrency"].items():
+        print(f"  concurrency={concurrency:>3}  {result['requests_per_second']:>8} req/s  "
+              f"p50={result['p50_ms']:>8} ms  p95={result['p95_ms']:>8} ms  errors={result['errors']}")
@@ -0,0 +1,66 @@
+import json
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from dishParser import format_dishes, parse_dishes  # noqa: E402
+from metrics.benchmark_database import DISHES, generate_json_report, time_call  # noqa: E402
+
+DEFAULT_SIZES = [100, 10_000, 100_000]
+DEFAULT_REPEAT = 20
+
+
+def generate_response(count, seed=42):
+    """LLM-style response with `count` dish lines and some noise between them"""
+    rng = random.Random(seed)
+    lines = ["Štai patiekalai:"]
+    for i in range(count):
+        lines.append(f"- Patiekalas: {rng.choice(DISHES)}")
+        if i % 10 == 0:
+            lines.append("")
+    return "\n".join(lines)
+
+
+def split_lines_parse(text):
+    # Ankstesnis būdas: split ir startswith kiekvienoje vietoje, žodynai kiekvienam patiekalui
+    products = []
+    for idx, line in enumerate(text.split("\n"), 1):
+        if line.strip().startswith("- Patiekalas:"):
+            products.append({"id": idx, "product_name": line.split(":", 1)[1].strip()})
+    return products
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, repeat=DEFAULT_REPEAT):
+    """Compare the old split/startswith parsing with dishParser for every response size"""
+    report = {"repeat": repeat, "sizes": {}}
+    for size in sizes:
+        text = generate_response(size)
+        names = [dish["product_name"] for dish in split_lines_parse(text)]
+        report["sizes"][str(size)] = {
+            "split_lines": time_call(lambda: split_lines_parse(text), repeat),
+            "parse_dishes": time_call(lambda: parse_dishes(text), repeat),
+            "parse_dishes_json": time_call(lambda: parse_dishes(json.dumps(names)), repeat),
+            "format_dishes": time_call(lambda: format_dishes(names), repeat),
+        }
+    return report
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    output_file = 'benchmark_parser.json'
+    if "--output" in args:
+        index = args.index("--output")
+        output_file = args[index + 1]
+        del args[index:index + 2]
+
+    sizes = [int(arg) for arg in args] or DEFAULT_SIZES
+    report = run_benchmarks(sizes)
+    generate_json_report(report, output_file)
+
+    for size, data in report["sizes"].items():
+        print(f"\n{size} patiekalų:")
+        for name, result in data.items():
+            print(f"  {name:20} p50={result['p50_ms']:>9} ms  p95={result['p95_ms']:>9} ms  "
+                  f"mem={result['peak_memory_kb']} KB")
@@ -0,0 +1,152 @@
+import heapq
+import itertools
+import math
+import os
+import re
+import threading
+import time
+
+# Prioritetai: mažesnis skaičius aptarnaujamas pirmiau
+INTERACTIVE = 0
+BACKFILL = 1
+
+# Groq nemokamo plano ribos (per minutę); keičiamos aplinkos kintamaisiais
+LIMITS = {
+    "llm": (int(os.getenv("LLM_RPM", "30")), int(os.getenv("LLM_TPM", "12000"))),
+    "transcription": (int(os.getenv("TRANSCRIPTION_RPM", "20")), None),
+}
+# Kiek ilgiausiai laukiama leidimo, kol kvietimas laikomas nepavykusiu
+MAX_WAIT = float(os.getenv("RATE_LIMIT_MAX_WAIT", "60"))
+
+_DURATION = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+class RateLimitTimeout(Exception):
+    pass
+
+
+def parse_duration(value):
+    # x-ratelimit-reset-* reikšmės: "7.66s", "2m59.56s", "120ms"
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        parts = _DURATION.findall(value)
+        return sum(float(number) * _UNITS[unit] for number, unit in parts) if parts else None
+
+
+def estimate_tokens(payload):
+    # Apytiksliai 4 simboliai tokenui plius visas leidžiamas atsakymas
+    text = "".join(message.get("content", "") for message in payload.get("messages", []))
+    return len(text) // 4 + payload.get("max_tokens", 0)
+
+
+class TokenBucket:
+
+    def __init__(self, capacity, per_seconds=60.0):
+        self.capacity = capacity
+        self.rate = capacity / per_seconds
+        self.level = float(capacity)
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount):
+        # Didesnis už talpą kiekis laukia tik pilno kibiro, kitaip lauktų amžinai
+        self._refill()
+        missing = min(amount, self.capacity) - self.level
+        if missing <= 0:
+            return 0.0
+        return missing / self.rate if self.rate > 0 else math.inf
+
+    def consume(self, amount):
+        self._refill()
+        self.level -= amount
+
+    def limit_to(self, remaining):
+        # Serverio likutis: niekada neturime daugiau, nei jis leidžia
+        self._refill()
+        self.level = min(self.level, remaining)
+
+
+class RateLimiter:
+    # Užklausų ir tokenų kibirai su prioritetine eile; bendras visoms gijoms
+
+    def __init__(self, requests_per_minute, tokens_per_minute=None):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._paused_until = 0.0
+        self._waiting = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+
+    def acquire(self, tokens=0, priority=INTERACTIVE, timeout=MAX_WAIT):
+        # Blokuoja, kol abiejuose kibiruose užtenka biudžeto ir nebelieka svarbesnių laukiančiųjų
+        deadline = None if timeout is None else time.monotonic() + timeout
+        entry = (priority, next(self._counter))
+        with self._condition:
+            heapq.heappush(self._waiting, entry)
+            try:
+                while True:
+                    delay = None
+                    if self._waiting[0] == entry:
+                        delay = self._delay(tokens)
+                        if delay <= 0:
+                            self.requests.consume(1)
+                            if self.tokens is not None:
+                                self.tokens.consume(tokens)
+                            return
+                    if deadline is not None:
+                        left = deadline - time.monotonic()
+                        if left <= 0:
+                            raise RateLimitTimeout(f"Viršytas užklausų limitas, laukta {timeout} s")
+                        delay = left if delay is None else min(delay, left)
+                    self._condition.wait(delay)
+            finally:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+                self._condition.notify_all()
+
+    def _delay(self, tokens):
+        delay = max(self._paused_until - time.monotonic(), self.requests.wait_time(1))
+        if self.tokens is not None:
+            delay = max(delay, self.tokens.wait_time(tokens))
+        return delay
+
+    def pause(self, seconds):
+        # Po 429 stabdomos visos gijos, ne tik gavusioji klaidą
+        with self._condition:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def update_from_headers(self, headers):
+        # x-ratelimit-remaining-requests/-tokens ir x-ratelimit-reset-requests/-tokens
+        with self._condition:
+            for name, bucket in (("requests", self.requests), ("tokens", self.tokens)):
+                remaining = headers.get(f"x-ratelimit-remaining-{name}")
+                if bucket is None or remaining is None:
+                    continue
+                try:
+                    remaining = float(remaining)
+                except ValueError:
+                    continue
+                bucket.limit_to(remaining)
+                reset = parse_duration(headers.get(f"x-ratelimit-reset-{name}"))
+                if remaining <= 0 and reset:
+                    self._paused_until = max(self._paused_until, time.monotonic() + reset)
+            self._condition.notify_all()
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(name):
+    with _limiters_lock:
+        if name not in _limiters:
+            _limiters[name] = RateLimiter(*LIMITS[name])
+        return _limiters[name]
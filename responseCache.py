@@ -0,0 +1,124 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+MEMORY_CACHE_SIZE = 256
+DISK_CACHE_SIZE = 10_000
+CACHE_TTL = 30 * 24 * 60 * 60  # sekundės
+
+
+def normalize_query(query):
+    # "Pusryčiams  valgiau košę." ir "pusryčiams valgiau košę" - tas pats raktas
+    text = unicodedata.normalize("NFC", query).lower()
+    return " ".join(text.split()).strip(" .,!?;:")
+
+
+def cache_key(query, model, prompt_version):
+    raw = f"{model}\x00{prompt_version}\x00{normalize_query(query)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    # Dviejų lygių LLM atsakymų talpykla: LRU atmintyje ir SQLite failas su TTL
+
+    def __init__(self, db_file, memory_size=MEMORY_CACHE_SIZE, disk_size=DISK_CACHE_SIZE, ttl=CACHE_TTL):
+        self.db_file = db_file
+        self.memory_size = memory_size
+        self.disk_size = disk_size
+        self.ttl = ttl
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connection(self):
+        if self._conn is None:
+            conn = sqlite3.connect(self.db_file, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with conn:
+                conn.execute('''
+                CREATE TABLE IF NOT EXISTS ResponseCache (
+                    key TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+                ''')
+                conn.execute('CREATE INDEX IF NOT EXISTS idx_response_cache_created_at ON ResponseCache (created_at)')
+            self._conn = conn
+        return self._conn
+
+    def get(self, key):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[1] > time.time() - self.ttl:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return entry[0]
+
+            row = self._connection().execute(
+                "SELECT response, created_at FROM ResponseCache WHERE key = ? AND created_at > ?",
+                (key, time.time() - self.ttl)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.disk_hits += 1
+            response = json.loads(row[0])
+            self._remember(key, response, row[1])
+            return response
+
+    def put(self, key, response):
+        now = time.time()
+        with self._lock:
+            self._remember(key, response, now)
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO ResponseCache (key, response, created_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(response, ensure_ascii=False), now)
+                )
+                # Pasenę ir per daug įrašų šalinami nuo seniausių
+                conn.execute("DELETE FROM ResponseCache WHERE created_at <= ?", (now - self.ttl,))
+                conn.execute('''
+                DELETE FROM ResponseCache WHERE key IN (
+                    SELECT key FROM ResponseCache ORDER BY created_at DESC LIMIT -1 OFFSET ?
+                )
+                ''', (self.disk_size,))
+
+    def _remember(self, key, response, created_at):
+        self._memory[key] = (response, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            conn = self._connection()
+            with conn:
+                conn.execute("DELETE FROM ResponseCache")
+
+    def stats(self):
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+                "memory_size": len(self._memory),
+            }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -1,10 +1,38 @@
+import asyncio
+import io
+import json
+import threading
+import time
 import unittest
+from unittest import mock
+
+import requests
+
+import LLM
 from LLM import call_llama_api, process_response, send_query
 
 
+def fake_response(status, body=None, headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response._content = (body or "{}").encode("utf-8")
+    response.raw = io.BytesIO(response._content)
+    response.headers.update(headers or {})
+    return response
+
+
+def use_fresh_backend(test):
+    # Naujas backend su savo grandinės pertraukikliu: ankstesnių testų ryšio klaidos jo neatjungia
+    for name in ("_backend", "_fallback_backend"):
+        patcher = mock.patch.object(LLM, name, None)
+        patcher.start()
+        test.addCleanup(patcher.stop)
+
+
 class TestLlamaFunctions(unittest.TestCase):
 
     def setUp(self):
+        use_fresh_backend(self)
         self.output_text = ""
         self.input_text = ""
 
@@ -131,6 +159,282 @@ class TestLlamaFunctions(unittest.TestCase):
             self.assertIn("Kebabas", response["text"])
             self.assertIn("Makaronai", response["text"])
 
+    def test_session_reused(self):
+        self.assertIs(LLM.get_session(), LLM.get_session())
+
+    def test_retry_after_honored(self):
+        """429 atveju laukiama tiek, kiek nurodo Retry-After"""
+        ok = fake_response(200, '{"choices": [{"message": {"content": "- Patiekalas: Pica"}}]}')
+        session = mock.Mock()
+        session.post.side_effect = [fake_response(429, headers={"Retry-After": "2"}), ok]
+
+        with mock.patch.object(LLM, "get_session", return_value=session), \
+                mock.patch.object(LLM.time, "sleep") as sleep:
+            response = call_llama_api("valgiau picą")
+
+        self.assertEqual(response, {"text": "- Patiekalas: Pica", "model": LLM.get_backend().model})
+        sleep.assert_called_once_with(2.0)
+        self.assertEqual(session.post.call_count, 2)
+
+    def test_retried_stream_response_closed(self):
+        """pakartojant srautinę užklausą ankstesnis atsakymas uždaromas, kad ryšys grįžtų į telkinį"""
+        busy, failed, ok = fake_response(503), fake_response(500), fake_response(200)
+        for response in (busy, failed, ok):
+            response.close = mock.Mock()
+        session = mock.Mock()
+        session.post.side_effect = [busy, ok]
+
+        with mock.patch.object(LLM, "get_session", return_value=session), \
+                mock.patch.object(LLM.time, "sleep"):
+            self.assertIs(LLM.post_with_retries("http://x", {}, {}, stream=True), ok)
+            session.post.side_effect = [failed] * (LLM.MAX_RETRIES + 1)
+            with self.assertRaises(requests.exceptions.HTTPError):
+                LLM.post_with_retries("http://x", {}, {}, stream=True)
+
+        busy.close.assert_called_once()
+        ok.close.assert_not_called()
+        self.assertEqual(failed.close.call_count, LLM.MAX_RETRIES + 1)
+
+    def test_long_retry_after_not_followed(self):
+        """Retry-After ilgesnis nei MAX_RETRY_AFTER - iškart grąžinama klaida"""
+        session = mock.Mock()
+        session.post.return_value = fake_response(429, headers={"Retry-After": str(LLM.MAX_RETRY_AFTER + 1)})
+
+        with mock.patch.object(LLM, "get_session", return_value=session), \
+                mock.patch.object(LLM.time, "sleep") as sleep:
+            response = call_llama_api("valgiau picą")
+
+        self.assertIn("Klaida jungiantis", response["error"])
+        sleep.assert_not_called()
+        self.assertEqual(session.post.call_count, 1)
+
+    def test_retries_exhausted(self):
+        """kai serveris vis grąžina 503, grąžinama klaida"""
+        session = mock.Mock()
+        session.post.return_value = fake_response(503)
+
+        with mock.patch.object(LLM, "get_session", return_value=session), \
+                mock.patch.object(LLM.time, "sleep"):
+            response = call_llama_api("valgiau picą")
+
+        self.assertIn("Klaida jungiantis", response["error"])
+        self.assertEqual(session.post.call_count, LLM.MAX_RETRIES + 1)
+
+    def test_retry_delay_backoff(self):
+        for attempt in range(6):
+            delay = LLM.retry_delay(attempt)
+            self.assertGreaterEqual(delay, 0)
+            self.assertLessEqual(delay, min(LLM.BACKOFF_MAX, LLM.BACKOFF_BASE * 2 ** attempt))
+
+
+def sse_response(chunks):
+    events = [f"data: {json.dumps({'choices': [{'delta': {'content': c}}]}, ensure_ascii=False)}" for c in chunks]
+    response = fake_response(200, "\n\n".join(events + ["data: [DONE]"]) + "\n\n")
+    response._content_consumed = True
+    return response
+
+
+class TestStreaming(unittest.TestCase):
+
+    def setUp(self):
+        use_fresh_backend(self)
+
+    def test_line_parser_split_chunks(self):
+        parser = LLM.DishLineParser()
+        self.assertEqual(parser.feed("- Patie"), [])
+        self.assertEqual(parser.feed("kalas: Cepelinai\n- Patiekalas: Ko"), ["Cepelinai"])
+        self.assertEqual(parser.feed("šė\nKita eilutė\n"), ["Košė"])
+        self.assertEqual(parser.feed("- Patiekalas: Blynai"), [])
+        self.assertEqual(parser.close(), ["Blynai"])
+
+    def test_stream_llama_api_emits_dishes(self):
+        session = mock.Mock()
+        session.post.return_value = sse_response(["- Patiekalas: Pi", "ca\n- Patiek", "alas: Kugelis"])
+        dishes = []
+
+        with mock.patch.object(LLM, "get_session", return_value=session):
+            response = LLM.stream_llama_api("valgiau picą ir kugelį", dishes.append)
+
+        self.assertEqual(dishes, ["Pica", "Kugelis"])
+        self.assertEqual(response, {"text": "- Patiekalas: Pica\n- Patiekalas: Kugelis", "model": LLM.get_backend().model})
+        self.assertTrue(session.post.call_args.kwargs["stream"])
+        self.assertTrue(session.post.call_args.kwargs["json"]["stream"])
+
+    def test_stream_records_latency(self):
+        session = mock.Mock()
+        session.post.return_value = sse_response(["- Patiekalas: Pica"])
+        histogram, first_token = LLM.LatencyHistogram(), LLM.LatencyHistogram()
+
+        with mock.patch.object(LLM, "get_session", return_value=session), \
+                mock.patch.object(LLM, "latency_histogram", histogram), \
+                mock.patch.object(LLM, "first_token_histogram", first_token):
+            LLM.stream_llama_api("valgiau picą", lambda name: None)
+
+        self.assertEqual(histogram.count, 1)
+        self.assertEqual(first_token.count, 1)
+
+    def test_stream_deadline(self):
+        # Lėtai lašantis srautas nutraukiamas po REQUEST_DEADLINE, nors kiekvienas skaitymas greitas
+        def trickle(decode_unicode=False):
+            for index in range(100):
+                time.sleep(0.02)
+                yield "data: " + json.dumps({"choices": [{"delta": {"content": f"- Patiekalas: P{index}\n"}}]})
+
+        response = mock.MagicMock()
+        response.__enter__.return_value.iter_lines = trickle
+        dishes = []
+
+        start = time.monotonic()
+        with mock.patch.object(LLM, "_post", return_value=response), \
+                mock.patch.object(LLM, "REQUEST_DEADLINE", 0.1):
+            result = LLM.stream_llama_api("valgiau picą", dishes.append)
+
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertIn("Klaida jungiantis", result["error"])
+        self.assertLess(len(dishes), 10)
+
+    def test_stream_query_from_cache(self):
+        cache = mock.Mock()
+        cache.get.return_value = {"text": "- Patiekalas: Pica"}
+        dishes = []
+
+        with mock.patch.object(LLM, "get_response_cache", return_value=cache), \
+                mock.patch.object(LLM, "stream_llama_api") as stream:
+            result = LLM.stream_query("valgiau picą su grybais", dishes.append)
+
+        stream.assert_not_called()
+        self.assertEqual(dishes, ["Pica"])
+        self.assertEqual(result, process_response({"text": "- Patiekalas: Pica"}))
+
+
+class TestBatchQueries(unittest.TestCase):
+
+    def setUp(self):
+        use_fresh_backend(self)
+        self.cache = mock.Mock()
+        self.cache.get.return_value = None
+        patcher = mock.patch.object(LLM, "get_response_cache", return_value=self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_parse_batch_response(self):
+        self.assertEqual(LLM.parse_batch_response('{"0": ["Pica"], "1": []}', 2), [["Pica"], []])
+        self.assertEqual(LLM.parse_batch_response('```json\n{"0": [" Kugelis "]}\n```', 1), [["Kugelis"]])
+        self.assertIsNone(LLM.parse_batch_response('{"0": ["Pica"]}', 2))
+        self.assertIsNone(LLM.parse_batch_response("- Patiekalas: Pica", 1))
+        self.assertIsNone(LLM.parse_batch_response('{"0": "Pica"}', 1))
+
+    def test_one_request_per_batch(self):
+        queries = ["valgiau picą su grybais", "", "valgiau cepelinus", "žiūrėjau filmą", "kebabas su padažu"]
+        content = json.dumps({"0": ["Pica su grybais"], "1": [], "2": ["Kebabas su padažu"]})
+        with mock.patch.object(LLM, "call_llama_api_batch", return_value={"text": content}) as batch, \
+                mock.patch.object(LLM, "call_llama_api") as single:
+            results = LLM.send_query_batch(queries)
+
+        batch.assert_called_once_with(["valgiau picą su grybais", "žiūrėjau filmą", "kebabas su padažu"])
+        single.assert_not_called()
+        self.assertEqual(results, [
+            process_response({"text": "- Patiekalas: Pica su grybais"}),
+            "Prašome įvesti tinkamą patiekalą.",
+            process_response({"text": "- Patiekalas: Cepelinai"}),
+            "Maisto produktų nerasta.",
+            process_response({"text": "- Patiekalas: Kebabas su padažu"}),
+        ])
+        self.assertEqual(self.cache.put.call_count, 3)
+
+    def test_batch_size(self):
+        queries = [f"tekstas {i}" for i in range(5)]
+        with mock.patch.object(LLM, "call_llama_api_batch",
+                               side_effect=lambda qs: {"text": json.dumps({str(i): [] for i in range(len(qs))})}) as batch:
+            LLM.send_query_batch(queries, batch_size=2)
+        self.assertEqual([len(call.args[0]) for call in batch.call_args_list], [2, 2, 1])
+
+    def test_fallback_to_single_requests(self):
+        with mock.patch.object(LLM, "call_llama_api_batch", return_value={"text": "ne JSON"}), \
+                mock.patch.object(LLM, "call_llama_api", return_value={"text": "- Patiekalas: Pica"}) as single:
+            results = LLM.send_query_batch(["valgiau picą su grybais", "pica su sūriu"])
+
+        self.assertEqual(single.call_count, 2)
+        self.assertEqual(results, [process_response({"text": "- Patiekalas: Pica"})] * 2)
+
+    def test_batch_request_error(self):
+        with mock.patch.object(LLM, "call_llama_api_batch", return_value={"error": "Klaida jungiantis: timeout"}), \
+                mock.patch.object(LLM, "call_llama_api") as single:
+            results = LLM.send_query_batch(["valgiau picą su grybais", "pica su sūriu"])
+
+        single.assert_not_called()
+        self.assertEqual(results, ["Klaida jungiantis: timeout"] * 2)
+
+    def test_batch_request_body(self):
+        session = mock.Mock()
+        session.post.return_value = fake_response(200, '{"choices": [{"message": {"content": "{}"}}]}')
+        with mock.patch.object(LLM, "get_session", return_value=session), \
+                mock.patch.object(LLM, "BATCH_DEADLINE", 5):
+            self.assertEqual(LLM.call_llama_api_batch(["a", "b"]), {"text": "{}", "model": LLM.get_backend().model})
+
+        # Paketui taip pat taikoma bendra laiko riba
+        self.assertLessEqual(session.post.call_args.kwargs["timeout"][1], 5)
+        body = session.post.call_args.kwargs["json"]
+        self.assertEqual(body["response_format"], {"type": "json_object"})
+        self.assertIn("[0] a\n[1] b", body["messages"][0]["content"])
+
+
+class TestAsyncQueries(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(LLM, "get_response_cache", return_value=mock.Mock(get=mock.Mock(return_value=None)))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_async_send_query(self):
+        with mock.patch.object(LLM, "call_llama_api", return_value={"text": "- Patiekalas: Pica"}):
+            result = asyncio.run(LLM.async_send_query("valgiau picą su grybais"))
+        self.assertEqual(result, process_response({"text": "- Patiekalas: Pica"}))
+        self.assertEqual(asyncio.run(LLM.async_send_query("  ")), "Prašome įvesti tinkamą patiekalą.")
+
+    def test_send_queries_in_order_and_bounded(self):
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def slow_call(query, priority=None):
+            with lock:
+                active.append(query)
+                peak.append(len(active))
+            time.sleep(0.05)
+            with lock:
+                active.remove(query)
+            return {"text": f"- Patiekalas: {query}"}
+
+        queries = [f"Patiekalas {i}" for i in range(8)]
+        with mock.patch.object(LLM, "call_llama_api", side_effect=slow_call):
+            results = LLM.send_queries(queries, concurrency=3)
+
+        self.assertEqual(results, [process_response({"text": f"- Patiekalas: {q}"}) for q in queries])
+        self.assertLessEqual(max(peak), 3)
+        self.assertGreater(max(peak), 1)
+
+    def test_send_queries_timeout(self):
+        def slow_call(query, priority=None):
+            time.sleep(0.5)
+            return {"text": "- Patiekalas: Pica"}
+
+        with mock.patch.object(LLM, "call_llama_api", side_effect=slow_call):
+            results = LLM.send_queries(["valgiau picą su grybais"], timeout=0.05)
+        self.assertIn("Klaida jungiantis", results[0])
+
+    def test_timed_out_call_keeps_slot(self):
+        # Užstrigusi gija užima vietą, todėl kita užklausa nelaukia vykdytojo eilėje savo timeout sąskaita
+        def call(query, priority=None):
+            time.sleep(0.3 if "lėta" in query else 0.01)
+            return {"text": f"- Patiekalas: {query}"}
+
+        with mock.patch.object(LLM, "call_llama_api", side_effect=call):
+            results = LLM.send_queries(["lėta su grybais", "greita su grybais"], concurrency=1, timeout=0.1)
+
+        self.assertIn("Klaida jungiantis", results[0])
+        self.assertEqual(results[1], process_response({"text": "- Patiekalas: greita su grybais"}))
+
 
 if __name__ == "__main__":
     unittest.main()
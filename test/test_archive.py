@@ -0,0 +1,214 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime
+
+from database.database import Database
+from database.write_queue import WriteQueue
+
+
+class TestArchive(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.db = Database(os.path.join(self.tmp, "data.db"))
+        self.db.add_products([
+            ("Kugelis", "2022-03-01 12:00:00"),
+            ("Cepelinai", "2023-06-01 12:00:00"),
+            ("Kugelis", "2023-12-31 23:00:00"),
+            ("Pica", "2024-02-01 12:00:00"),
+        ])
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmp)
+
+    def archive(self):
+        return self.db.archive_older_than(datetime(2024, 1, 1))
+
+    def test_rows_moved_to_yearly_files(self):
+        self.assertEqual(self.archive(), 3)
+        self.assertTrue(os.path.exists(os.path.join(self.tmp, "data_2022.db")))
+        self.assertTrue(os.path.exists(os.path.join(self.tmp, "data_2023.db")))
+        self.assertEqual([a["name"] for a in self.db.list_archives()], ["archive_2023", "archive_2022"])
+
+        hot = self.db._connection().execute("SELECT COUNT(*) FROM main.Product").fetchone()[0]
+        self.assertEqual(hot, 1)
+
+    def test_monthly_granularity(self):
+        self.db.archive_older_than(datetime(2024, 1, 1), granularity='month')
+        self.assertTrue(os.path.exists(os.path.join(self.tmp, "data_2023-06.db")))
+        self.assertEqual(len(self.db.list_archives()), 3)
+        with self.assertRaises(ValueError):
+            self.db.archive_older_than(granularity='week')
+
+    def test_recent_range_does_not_attach_archives(self):
+        self.archive()
+        self.db.close()
+        products = self.db.get_products_between(datetime(2024, 1, 1), datetime(2024, 3, 1))
+        self.assertEqual([p["product_name"] for p in products], ["Pica"])
+        attached = [row["name"] for row in self.db._connection().execute("PRAGMA database_list")]
+        self.assertEqual(attached, ["main"])
+
+    def test_queries_reach_into_archives(self):
+        before = self.db.get_all_products()
+        self.archive()
+
+        self.assertEqual(self.db.get_all_products(), before)
+        self.assertEqual(list(self.db.iter_products()), before)
+        products = self.db.get_products_between(datetime(2023, 1, 1), datetime(2024, 3, 1))
+        self.assertEqual([p["product_name"] for p in products], ["Pica", "Kugelis", "Cepelinai"])
+        self.assertEqual(self.db.dish_frequency(), [("Kugelis", 2), ("Cepelinai", 1), ("Pica", 1)])
+        self.assertEqual(self.db.count_by_period('month', end=datetime(2023, 1, 1)), [("2022-03", 1)])
+        self.assertEqual(self.db.dish_first_last("Kugelis"),
+                         [("Kugelis", "2022-03-01 12:00:00", "2023-12-31 23:00:00")])
+
+        first = self.db.get_products_page(limit=2)
+        second = self.db.get_products_page(first[-1]["created_at"], first[-1]["id"], limit=2)
+        self.assertEqual(first + second, before)
+
+    def test_search_reaches_into_archives(self):
+        self.archive()
+        found = self.db.search_products("kugel")
+        self.assertEqual([(p["product_name"], p["created_at"]) for p in found],
+                         [("Kugelis", "2023-12-31 23:00:00"), ("Kugelis", "2022-03-01 12:00:00")])
+
+        self.db.update_product(found[-1]["id"], "Vafliai")
+        self.assertEqual(len(self.db.search_products("kugelis")), 1)
+        self.assertEqual([p["id"] for p in self.db.search_products("vafl")], [found[-1]["id"]])
+
+    def test_migration_indexes_existing_archives(self):
+        self.archive()
+        path = os.path.join(self.tmp, self.db.list_archives()[-1]["file"])
+        conn = sqlite3.connect(path)
+        with conn:
+            conn.execute("DROP TABLE ProductSearch")
+            for trigger in ("product_search_insert", "product_search_delete", "product_search_update"):
+                conn.execute(f"DROP TRIGGER {trigger}")
+        conn.close()
+        self.db.close()
+        self.db._connection().execute("PRAGMA user_version = 7")
+
+        self.db.create_tables()
+        self.assertEqual(len(self.db.search_products("kugelis")), 2)
+
+    def test_update_and_delete_archived_rows(self):
+        self.archive()
+        kugelis = [p for p in self.db.get_all_products() if p["created_at"].startswith("2022")][0]
+
+        self.db.update_product(kugelis["id"], "Kugelis su spirgais")
+        names = [p["product_name"] for p in self.db.get_all_products()]
+        self.assertIn("Kugelis su spirgais", names)
+
+        self.db.delete_product(kugelis["id"])
+        self.assertEqual(len(self.db.get_all_products()), 3)
+
+        self.db.delete_all_products()
+        self.assertEqual(self.db.get_all_products(), [])
+
+    def test_update_archived_row_without_attach(self):
+        self.archive()
+        product_id = self.db.get_all_products()[-1]["id"]
+        self.db.close()  # naujas prisijungimas be prijungtų archyvų
+        self.db.update_product(product_id, "Kugelis su spirgais")
+        self.assertEqual(self.db.get_all_products()[-1]["product_name"], "Kugelis su spirgais")
+
+    def test_rollback_restores_archived_row_and_summary(self):
+        self.archive()
+        product_id = self.db.get_all_products()[-1]["id"]  # 2022 m. Kugelis
+        self.db.close()  # naujas prisijungimas be prijungtų archyvų
+        summary = self.db.summary_dish_frequency()
+
+        with self.assertRaises(RuntimeError):
+            with self.db.transaction(self.db.archives_for([product_id])):
+                self.db.update_product(product_id, "Cepelinai")
+                raise RuntimeError
+        self.assertEqual(self.db.get_all_products()[-1]["product_name"], "Kugelis")
+        self.assertEqual(self.db.summary_dish_frequency(), summary)
+        self.assertEqual(self.db.summary_dish_frequency(), self.db.dish_frequency())
+
+    def test_archived_edits_in_write_batch(self):
+        self.archive()
+        products = self.db.get_all_products()
+        self.db.close()
+        writer = WriteQueue(self.db)
+        writer.submit("update_product", products[-1]["id"], "Vafliai")
+        writer.submit("delete_product", products[-2]["id"])
+        writer.submit("delete_all_products")
+        writer.submit("add_product", "Blynai", "2023-05-01 12:00:00")
+        writer.close()
+
+        self.assertEqual([p["product_name"] for p in self.db.get_all_products()], ["Blynai"])
+        # Išregistruoto archyvo eilutės neatgyja jį sukūrus iš naujo
+        self.archive()
+        self.assertEqual([p["product_name"] for p in self.db.get_all_products()], ["Blynai"])
+        self.assertEqual(self.db.summary_dish_frequency(), [("Blynai", 1)])
+
+    def test_daily_summary_kept_for_archived_rows(self):
+        before = self.db.summary_count_by_period('month')
+        self.archive()
+        self.assertEqual(self.db.summary_count_by_period('month'), before)
+
+        product_id = self.db.get_all_products()[-1]["id"]  # 2022 m. Kugelis
+        self.db.update_product(product_id, "Cepelinai")
+        self.assertEqual(self.db.summary_dish_frequency(), self.db.dish_frequency())
+        self.db.delete_product(product_id)
+        self.assertEqual(self.db.summary_count_by_period('month'), self.db.count_by_period('month'))
+
+        self.db.rebuild_daily_summary()
+        self.assertEqual(self.db.summary_count_by_period('month'), self.db.count_by_period('month'))
+
+    def test_archive_is_repeatable(self):
+        self.archive()
+        self.assertEqual(self.archive(), 0)
+        self.assertEqual(len(self.db.get_all_products()), 4)
+
+    def test_no_duplicates_between_phases(self):
+        self.archive()
+        self.db.add_product("Blynai", "2023-05-01 12:00:00")
+        before = self.db.get_all_products()
+        summary = self.db.summary_dish_frequency()
+
+        # 2 fazė nepavyksta: eilutė jau nukopijuota į įregistruotą 2023 m. archyvą, bet liko ir pagrindinėje DB
+        conn = self.db._connection()
+        conn.execute("CREATE TEMP TRIGGER fail_delete BEFORE DELETE ON main.Product BEGIN SELECT RAISE(ABORT, 'x'); END")
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.archive()
+        self.assertEqual(self.db.get_all_products(), before)
+        self.assertEqual(self.db.search_products("blynai"), [p for p in before if p["product_name"] == "Blynai"])
+        self.assertEqual(self.db.summary_dish_frequency(), summary)
+
+        conn.execute("DROP TRIGGER temp.fail_delete")
+        self.assertEqual(self.archive(), 1)
+        self.assertEqual(self.db.get_all_products(), before)
+        self.assertEqual(self.db.summary_dish_frequency(), self.db.dish_frequency())
+
+    def test_more_archives_than_attach_limit(self):
+        # 14 mėnesinių archyvų > SQLite riba (10 prijungtų DB)
+        months = [(2022, m) for m in range(1, 13)] + [(2023, 1), (2023, 2)]
+        self.db.add_products([("Blynai", f"{y}-{m:02d}-15 12:00:00") for y, m in months])
+        before = self.db.get_all_products()
+
+        self.assertEqual(self.db.archive_older_than(datetime(2023, 3, 1), 'month'), len(months) + 1)
+        self.assertEqual(len(self.db.list_archives()), 14)
+        self.assertEqual(self.db.get_all_products(), before)
+        self.assertEqual(self.db.get_products_page(limit=100), before)
+        self.assertEqual(dict(self.db.dish_frequency())["Blynai"], 14)
+        blynai = [p for p in before if p["product_name"] == "Blynai"]
+        with self.db.snapshot() as snap:
+            self.assertEqual(snap.get_all_products(), before)
+            self.assertEqual(snap.search_products("blynai", limit=100), blynai)
+        self.assertEqual(self.db.search_products("blynai", limit=100), blynai)
+
+        # Pakeitimas seniausiame (neprijungtame) archyve matomas kitame skaityme
+        oldest = next(p for p in before if p["created_at"].startswith("2022-01"))
+        self.db.update_product(oldest["id"], "Vafliai")
+        self.assertIn("Vafliai", [p["product_name"] for p in self.db.get_all_products()])
+        self.db.delete_product(oldest["id"])
+        self.assertEqual(len(self.db.get_all_products()), len(before) - 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
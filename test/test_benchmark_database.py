@@ -0,0 +1,25 @@
+import json
+import os
+import tempfile
+
+from metrics.benchmark_database import generate_json_report, percentiles, run_benchmarks
+
+
+def test_percentiles():
+    samples = [i / 1000 for i in range(1, 101)]
+    assert percentiles(samples) == {"p50_ms": 51.0, "p95_ms": 96.0, "p99_ms": 100.0}
+
+
+def test_run_benchmarks_small_dataset():
+    report = run_benchmarks(sizes=[200], repeat=3)
+    methods = report["sizes"]["200"]["methods"]
+
+    for name in ("get_all_products", "get_products_today", "add_product", "add_products_chunked_100",
+                 "delete_product", "delete_all_products"):
+        assert set(methods[name]) == {"p50_ms", "p95_ms", "p99_ms", "peak_memory_kb"}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output_file = os.path.join(tmp, "benchmark.json")
+        generate_json_report(report, output_file)
+        with open(output_file, encoding="utf-8") as f:
+            assert json.load(f)["sizes"]["200"]["methods"] == methods
@@ -3,7 +3,8 @@ import unittest
 import sqlite3
 from datetime import datetime, timedelta
 
-from database.database import Database
+from database.cache import QueryCache
+from database.database import Database, PERIOD_QUERY, day_range, week_range, month_range
 from pathlib import Path
 
 TEST_DB = Path(__file__).parent / 'test_data.db'
@@ -11,11 +12,10 @@ TEST_DB = Path(__file__).parent / 'test_data.db'
 class TestDatabase(unittest.TestCase):
 
     def setUp(self):
-        self.db = Database()
-        self.db.db_file = TEST_DB
-        self.db.create_tables()
+        self.db = Database(TEST_DB)
 
     def tearDown(self):
+        self.db.close()
         if os.path.exists(TEST_DB):
             os.remove(TEST_DB)
 
@@ -27,6 +27,24 @@ class TestDatabase(unittest.TestCase):
         conn.close()
         self.assertIsNotNone(table)
 
+    def test_connection_reused(self):
+        conn = self.db._connection()
+        self.db.add_product("Apple")
+        self.db.get_all_products()
+        self.assertIs(self.db._connection(), conn)
+
+    def test_connection_pragmas(self):
+        conn = self.db._connection()
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 1)  # NORMAL
+
+    def test_context_manager_closes(self):
+        with Database(TEST_DB) as db:
+            db.add_product("Apple")
+            conn = db._connection()
+        with self.assertRaises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+
     def test_add_product(self):
         self.db.add_product("Apple")
         products = self.db.get_all_products()
@@ -44,6 +62,168 @@ class TestDatabase(unittest.TestCase):
         self.assertEqual(len(products), 2)
         self.assertEqual(products[1]['product_name'], 'Banana')
 
+    def test_add_products(self):
+        ids = self.db.add_products(["Apple", "Banana", ("Cherry", "2024-01-01 12:00:00")])
+        self.assertEqual(len(ids), 3)
+        products = {p['id']: p for p in self.db.get_all_products()}
+        self.assertEqual([products[i]['product_name'] for i in ids], ["Apple", "Banana", "Cherry"])
+        self.assertEqual(products[ids[2]]['created_at'], "2024-01-01 12:00:00")
+        self.assertIsNotNone(products[ids[0]]['created_at'])
+
+    def test_add_products_empty(self):
+        self.assertEqual(self.db.add_products([]), [])
+        self.assertEqual(len(self.db.get_all_products()), 0)
+
+    def test_add_products_chunked(self):
+        ids = self.db.add_products_chunked((f"Dish {i}" for i in range(25)), chunk_size=10)
+        self.assertEqual(len(ids), 25)
+        self.assertEqual(len(set(ids)), 25)
+        self.assertEqual(len(self.db.get_all_products()), 25)
+
+    def test_get_products_page(self):
+        self.db.add_products([("Old", "2024-01-01 08:00:00"), ("Tie A", "2024-01-02 08:00:00"),
+                              ("Tie B", "2024-01-02 08:00:00"), ("New", "2024-01-03 08:00:00")])
+        first = self.db.get_products_page(limit=2)
+        self.assertEqual([p['product_name'] for p in first], ["New", "Tie A"])
+
+        last = first[-1]
+        second = self.db.get_products_page(last['created_at'], last['id'], limit=2)
+        self.assertEqual([p['product_name'] for p in second], ["Tie B", "Old"])
+
+        last = second[-1]
+        self.assertEqual(self.db.get_products_page(last['created_at'], last['id'], limit=2), [])
+
+    def test_iter_products(self):
+        self.db.add_products_chunked(f"Dish {i}" for i in range(7))
+        streamed = list(self.db.iter_products(batch_size=3))
+        self.assertEqual(streamed, self.db.get_all_products())
+
+    def test_dish_frequency(self):
+        self.db.add_products([("Pica", "2024-05-01 12:00:00"), ("Pica", "2024-05-02 12:00:00"),
+                              ("Sriuba", "2024-05-02 13:00:00"), ("Pica", "2024-06-01 12:00:00")])
+        self.assertEqual(self.db.dish_frequency(), [("Pica", 3), ("Sriuba", 1)])
+        self.assertEqual(self.db.dish_frequency(limit=1), [("Pica", 3)])
+        may = month_range(datetime(2024, 5, 10))
+        self.assertEqual(self.db.dish_frequency(*may), [("Pica", 2), ("Sriuba", 1)])
+
+    def test_count_by_period(self):
+        self.db.add_products([("Pica", "2024-05-01 12:00:00"), ("Sriuba", "2024-05-01 13:00:00"),
+                              ("Pica", "2024-06-03 12:00:00")])
+        self.assertEqual(self.db.count_by_period('day'), [("2024-05-01", 2), ("2024-06-03", 1)])
+        self.assertEqual(self.db.count_by_period('month'), [("2024-05", 2), ("2024-06", 1)])
+        self.assertEqual(self.db.count_by_period('week', end=datetime(2024, 6, 1)), [("2024-18", 2)])
+        with self.assertRaises(ValueError):
+            self.db.count_by_period('year')
+
+    def test_dish_first_last(self):
+        self.db.add_products([("Pica", "2024-05-01 12:00:00"), ("Pica", "2024-06-01 12:00:00"),
+                              ("Sriuba", "2024-05-02 13:00:00")])
+        self.assertEqual(self.db.dish_first_last("Pica"), [("Pica", "2024-05-01 12:00:00", "2024-06-01 12:00:00")])
+        self.assertEqual(len(self.db.dish_first_last()), 2)
+        self.assertEqual(self.db.dish_first_last("Kebabas"), [])
+
+    def test_search_products(self):
+        self.db.add_products(["Cepelinai su kiauliena", "Šaltibarščiai", "Kebabas su česnakiniu padažu"])
+        self.assertEqual([p['product_name'] for p in self.db.search_products("cepelinai")],
+                         ["Cepelinai su kiauliena"])
+        self.assertEqual([p['product_name'] for p in self.db.search_products("cepel")],
+                         ["Cepelinai su kiauliena"])
+        self.assertEqual([p['product_name'] for p in self.db.search_products("saltibarsciai")],
+                         ["Šaltibarščiai"])
+        self.assertEqual([p['product_name'] for p in self.db.search_products("kebabas cesnak")],
+                         ["Kebabas su česnakiniu padažu"])
+        self.assertEqual(self.db.search_products('"'), [])
+
+    def test_search_index_follows_changes(self):
+        self.db.add_product("Pica")
+        product_id = self.db.get_all_products()[0]['id']
+        self.db.update_product(product_id, "Sriuba")
+        self.assertEqual(self.db.search_products("pica"), [])
+        self.assertEqual(len(self.db.search_products("sriuba")), 1)
+        self.db.delete_product(product_id)
+        self.assertEqual(self.db.search_products("sriuba"), [])
+
+    def test_search_index_built_for_existing_rows(self):
+        conn = self.db.get_connection()
+        for trigger in ("product_search_insert", "product_search_delete", "product_search_update"):
+            conn.execute(f"DROP TRIGGER {trigger}")
+        conn.execute("DROP TABLE ProductSearch")
+        conn.execute("INSERT INTO Product (product_name) VALUES ('Koldūnai')")
+        conn.execute("PRAGMA user_version = 3")
+        conn.commit()
+        conn.close()
+        self.db.create_tables()
+        self.assertEqual(len(self.db.search_products("koldunai")), 1)
+
+    def test_cache_hits_and_misses(self):
+        self.db.add_product("Apple")
+        stats = self.db.cache_stats()
+        self.db.get_products_today()
+        self.db.get_products_today()
+        self.db.get_all_products()
+        self.db.get_products_today()
+        after = self.db.cache_stats()
+        self.assertEqual(after["misses"] - stats["misses"], 2)
+        self.assertEqual(after["hits"] - stats["hits"], 2)
+
+    def test_cache_invalidated_by_writes(self):
+        self.db.add_product("Apple")
+        product_id = self.db.get_all_products()[0]['id']
+        self.db.update_product(product_id, "Pear")
+        self.assertEqual(self.db.get_products_today()[0]['product_name'], "Pear")
+        self.db.add_products(["Banana"])
+        self.assertEqual(len(self.db.get_products_today()), 2)
+        self.db.delete_product(product_id)
+        self.assertEqual(len(self.db.get_products_today()), 1)
+        self.db.delete_all_products()
+        self.assertEqual(self.db.get_products_today(), [])
+
+    def test_cache_returns_copies(self):
+        self.db.add_product("Apple")
+        self.db.get_all_products()[0]['product_name'] = "Changed"
+        self.assertEqual(self.db.get_all_products()[0]['product_name'], "Apple")
+
+    def test_query_cache_lru_eviction(self):
+        cache = QueryCache(maxsize=2)
+        cache.get_or_load("a", lambda: 1)
+        cache.get_or_load("b", lambda: 2)
+        cache.get_or_load("a", lambda: 1)
+        cache.get_or_load("c", lambda: 3)  # išmeta "b"
+        self.assertEqual(cache.get_or_load("a", lambda: 10), 1)
+        self.assertEqual(cache.get_or_load("b", lambda: 20), 20)
+        self.assertEqual(cache.stats(), {"hits": 2, "misses": 4, "size": 2})
+
+    def test_daily_summary_follows_writes(self):
+        ids = self.db.add_products([("Pica", "2024-05-01 12:00:00"), ("Pica", "2024-05-01 19:00:00"),
+                                    ("Sriuba", "2024-05-02 13:00:00")])
+        self.assertEqual(self.db.summary_count_by_period('day'), [("2024-05-01", 2), ("2024-05-02", 1)])
+
+        self.db.update_product(ids[0], "Sriuba")
+        self.assertEqual(self.db.summary_dish_frequency(), [("Sriuba", 2), ("Pica", 1)])
+
+        self.db.delete_product(ids[1])
+        self.assertEqual(self.db.summary_count_by_period('day'), [("2024-05-01", 1), ("2024-05-02", 1)])
+        rows = self.db._connection().execute("SELECT * FROM DailySummary WHERE product_name = 'Pica'").fetchall()
+        self.assertEqual(rows, [])  # nuliniai įrašai ištrinami
+
+        self.db.delete_all_products()
+        self.assertEqual(self.db.summary_count_by_period('month'), [])
+
+    def test_daily_summary_matches_raw_counts(self):
+        self.db.add_products([(f"Dish {i % 3}", f"2024-0{1 + i % 3}-1{i % 7} 12:00:00") for i in range(40)])
+        for period in ("day", "week", "month"):
+            self.assertEqual(self.db.summary_count_by_period(period), self.db.count_by_period(period))
+        may = month_range(datetime(2024, 2, 10))
+        self.assertEqual(self.db.summary_dish_frequency(*may), self.db.dish_frequency(*may))
+        self.assertEqual(self.db.summary_dish_frequency(limit=1), self.db.dish_frequency(limit=1))
+
+    def test_rebuild_daily_summary(self):
+        self.db.add_product("Pica", "2024-05-01 12:00:00")
+        self.db._connection().execute("DELETE FROM DailySummary")
+        self.db._connection().commit()
+        self.db.rebuild_daily_summary()
+        self.assertEqual(self.db.summary_count_by_period('day'), [("2024-05-01", 1)])
+
     def test_delete_product(self):
         self.db.add_product("Apple")
         products = self.db.get_all_products()
@@ -111,5 +291,27 @@ class TestDatabase(unittest.TestCase):
         products = self.db.get_products_this_month()
         self.assertEqual(len(products), 0)
 
+    def test_period_query_uses_index(self):
+        start, end = day_range(datetime(2024, 5, 15, 10, 30))
+        plan = self.db.query_plan(PERIOD_QUERY, (str(start), str(end)))
+        self.assertTrue(any("USING INDEX idx_product_created_at" in step for step in plan))
+        self.assertNotIn("SCAN Product", plan)
+
+    def test_get_products_between_half_open(self):
+        self.db.add_product("Start", "2024-05-15 00:00:00")
+        self.db.add_product("End", "2024-05-16 00:00:00")
+        products = self.db.get_products_between(*day_range(datetime(2024, 5, 15, 18, 0)))
+        self.assertEqual([p['product_name'] for p in products], ["Start"])
+
+    def test_period_ranges(self):
+        wednesday = datetime(2024, 5, 15, 10, 30)
+        self.assertEqual(day_range(wednesday), (datetime(2024, 5, 15), datetime(2024, 5, 16)))
+        self.assertEqual(week_range(wednesday), (datetime(2024, 5, 13), datetime(2024, 5, 20)))
+        self.assertEqual(month_range(wednesday), (datetime(2024, 5, 1), datetime(2024, 6, 1)))
+        self.assertEqual(month_range(datetime(2024, 12, 31)), (datetime(2024, 12, 1), datetime(2025, 1, 1)))
+        # Savaitė nekerta metų ribos, kaip strftime('%W')
+        self.assertEqual(week_range(datetime(2025, 1, 1)), (datetime(2025, 1, 1), datetime(2025, 1, 6)))
+        self.assertEqual(week_range(datetime(2024, 12, 31)), (datetime(2024, 12, 30), datetime(2025, 1, 1)))
+
 if __name__ == '__main__':
     unittest.main()
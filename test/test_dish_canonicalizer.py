@@ -0,0 +1,72 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from database.database import Database
+from dishCanonicalizer import DishCanonicalizer, normalize_name, trigrams
+
+
+class TestDishCanonicalizer(unittest.TestCase):
+
+    def setUp(self):
+        self.canonicalizer = DishCanonicalizer(["Cepelinai su kiauliena", "Koldūnai su grietine", "Pica"])
+
+    def test_normalize_name(self):
+        self.assertEqual(normalize_name("  Koldūnai   su\tGRIETINE "), "koldunai su grietine")
+        self.assertIn("  p", trigrams("pica"))
+
+    def test_exact_and_diacritics(self):
+        self.assertEqual(self.canonicalizer.canonicalize("cepelinai  su kiauliena"), "Cepelinai su kiauliena")
+        self.assertEqual(self.canonicalizer.canonicalize("Koldunai su grietine"), "Koldūnai su grietine")
+
+    def test_near_duplicate_snaps(self):
+        self.assertEqual(self.canonicalizer.canonicalize("Cepelinai su kiaulienos"), "Cepelinai su kiauliena")
+        self.assertEqual(self.canonicalizer.canonicalize("Koldūnai su grietinė"), "Koldūnai su grietine")
+
+    def test_different_dishes_kept(self):
+        self.assertEqual(self.canonicalizer.canonicalize("Koldūnai su sviestu"), "Koldūnai su sviestu")
+        self.assertEqual(self.canonicalizer.canonicalize(" Picos kepsnys "), "Picos kepsnys")
+        self.assertEqual(self.canonicalizer.canonicalize(""), "")
+
+    def test_incremental_add(self):
+        self.assertEqual(self.canonicalizer.canonicalize("Šaltibarščiai su bulvėmis"), "Šaltibarščiai su bulvėmis")
+        self.canonicalizer.add("Šaltibarščiai su bulvėm")
+        self.assertEqual(len(self.canonicalizer), 4)
+        self.assertEqual(self.canonicalizer.canonicalize("Šaltibarščiai su bulvėmis"), "Šaltibarščiai su bulvėm")
+        # Jau esantis pavadinimas nepakeičiamas
+        self.canonicalizer.add("cepelinai su kiauliena")
+        self.assertEqual(self.canonicalizer.canonicalize("Cepelinai su kiauliena"), "Cepelinai su kiauliena")
+
+    def test_most_frequent_spelling_from_database(self):
+        with tempfile.TemporaryDirectory() as directory:
+            db = Database(os.path.join(directory, "test.db"))
+            db.create_tables()
+            db.add_products(["Cepelinai su kiaulienos", "Cepelinai su kiauliena", "Cepelinai su kiauliena"])
+            canonicalizer = DishCanonicalizer.from_database(db)
+            db.close()
+        self.assertEqual(canonicalizer.canonicalize("cepelinai su kiaulienom"), "Cepelinai su kiauliena")
+        # Retesnis jau išsaugotas variantas taip pat rodo į dažnesnį
+        self.assertEqual(canonicalizer.canonicalize("Cepelinai su kiaulienos"), "Cepelinai su kiauliena")
+
+    def test_build_does_not_match(self):
+        # Kuriant indeksą pavadinimai nelyginami tarpusavyje - tai daroma tik paieškos metu
+        with mock.patch.object(DishCanonicalizer, "_best_match", side_effect=AssertionError):
+            canonicalizer = DishCanonicalizer(["Cepelinai su kiauliena", "Cepelinai su kiaulienos"])
+        self.assertEqual(len(canonicalizer), 2)
+
+    def test_sub_millisecond_lookup(self):
+        sides = ["kiauliena", "grietine", "sviestu", "varške", "uogomis", "bulvėmis", "ryžiais", "sūriu", "grybais"]
+        dishes = ["Cepelinai", "Koldūnai", "Blynai", "Kepsnys", "Sriuba", "Salotos", "Makaronai", "Kotletai"]
+        names = [f"{dish} su {side} {i}" for i in range(14) for dish in dishes for side in sides]
+        canonicalizer = DishCanonicalizer(names)
+        queries = [name[:-1] + "x" for name in names[:200]]
+        start = time.perf_counter()
+        for query in queries:
+            canonicalizer.canonicalize(query)
+        self.assertLess((time.perf_counter() - start) / len(queries), 0.001)
+
+
+if __name__ == "__main__":
+    unittest.main()
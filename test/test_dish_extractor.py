@@ -0,0 +1,45 @@
+import unittest
+from unittest import mock
+
+import LLM
+from dishExtractor import DishExtractor, extract_dishes, stem, stems
+from dishParser import format_dishes
+
+
+class TestDishExtractor(unittest.TestCase):
+
+    def test_stemming_ignores_endings_and_diacritics(self):
+        self.assertEqual(stems("cepelinai cepelinus"), ["cepelin", "cepelin"])
+        self.assertEqual(stems("košė košę kose"), ["kos", "kos", "kos"])
+        self.assertEqual(stem("pie"), "pie")
+
+    def test_simple_sentences(self):
+        self.assertEqual(extract_dishes("valgiau cepelinus"), ["Cepelinai"])
+        self.assertEqual(extract_dishes("Pietums sriubą."), ["Sriuba"])
+        self.assertEqual(extract_dishes("I ate pizza and salad for lunch"), ["Pica", "Salotos"])
+
+    def test_longest_match_and_duplicates(self):
+        self.assertEqual(extract_dishes("žemaičių blynus ir bulvių košę"), ["Žemaičių blynai", "Bulvių košė"])
+        self.assertEqual(extract_dishes("blynus ir dar blynus"), ["Blynai"])
+
+    def test_ambiguous_input_not_confident(self):
+        self.assertIsNone(extract_dishes("valgiau kebabą su česnakiniu padažu"))
+        self.assertIsNone(extract_dishes("valgiau 2 picas"))
+        self.assertIsNone(extract_dishes("Šiandien žiūrėjau filmą"))
+        self.assertIsNone(extract_dishes("vakar valgiau pietus"))
+
+    def test_custom_lexicon(self):
+        extractor = DishExtractor({"Kibinai": ["kibinai"]}, ["valgiau"])
+        self.assertEqual(extractor.extract("valgiau kibiną"), ["Kibinai"])
+        self.assertIsNone(extractor.extract("valgiau cepelinus"))
+
+    def test_send_query_skips_llm(self):
+        with mock.patch.object(LLM, "call_llama_api") as call:
+            result = LLM.send_query("valgiau cepelinus ir šaltibarščius")
+
+        call.assert_not_called()
+        self.assertEqual(result, LLM.process_response({"text": format_dishes(["Cepelinai", "Šaltibarščiai"])}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+
+from dishParser import Dish, DishLineParser, format_dishes, parse_dish_names, parse_dishes, parse_line
+from metrics.benchmark_parser import generate_response, run_benchmarks, split_lines_parse
+
+
+class TestDishParser(unittest.TestCase):
+
+    def test_bullet_format(self):
+        text = "Štai:\n- Patiekalas: Pica  \r\n\n  - Patiekalas: Kugelis\n- Patiekalas: \nKita eilutė"
+        self.assertEqual(parse_dishes(text), [Dish(1, "Pica"), Dish(2, "Kugelis")])
+
+    def test_json_format(self):
+        self.assertEqual(parse_dish_names('["Pica", " Kugelis ", "", 3]'), ["Pica", "Kugelis"])
+        self.assertEqual(parse_dish_names('{"dishes": ["Cepelinai"]}'), ["Cepelinai"])
+        # Ne JSON, nors prasideda "[" - skaitomos eilutės
+        self.assertEqual(parse_dish_names("[atsakymas]\n- Patiekalas: Pica"), ["Pica"])
+
+    def test_round_trip(self):
+        names = ["Pica", "Cepelinai su kiauliena"]
+        self.assertEqual(parse_dish_names(format_dishes(names)), names)
+
+    def test_parse_line(self):
+        self.assertEqual(parse_line("  - Patiekalas: Pica "), "Pica")
+        self.assertIsNone(parse_line("- Patiekalas:"))
+        self.assertIsNone(parse_line("Pica"))
+
+    def test_stream_parser(self):
+        parser = DishLineParser()
+        self.assertEqual(parser.feed("- Patiekalas: Pi"), [])
+        self.assertEqual(parser.feed("ca\n- Patiekalas: Kugelis"), ["Pica"])
+        self.assertEqual(parser.close(), ["Kugelis"])
+
+    def test_slots(self):
+        dish = Dish(1, "Pica")
+        with self.assertRaises(AttributeError):
+            dish.product_name = "Pica"
+
+    def test_matches_split_lines(self):
+        text = generate_response(500)
+        self.assertEqual(parse_dish_names(text), [p["product_name"] for p in split_lines_parse(text)])
+
+    def test_benchmark_report(self):
+        report = run_benchmarks(sizes=[50], repeat=2)
+        self.assertEqual(set(report["sizes"]["50"]), {"split_lines", "parse_dishes", "parse_dishes_json", "format_dishes"})
+
+
+if __name__ == "__main__":
+    unittest.main()
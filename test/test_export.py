@@ -0,0 +1,69 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from database.database import Database
+from database.export import detect_format, export_products, import_products
+
+
+class TestExport(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.db = Database(os.path.join(self.tmp, "data.db"))
+        self.db.add_products([("Cepelinai", "2024-01-01 12:00:00"), ("Šaltibarščiai", "2024-01-02 12:00:00"),
+                              ("Kugelis, su spirgais", "2024-01-03 12:00:00")])
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmp)
+
+    def path(self, name):
+        return os.path.join(self.tmp, name)
+
+    def names(self, db):
+        return [(p["product_name"], p["created_at"]) for p in db.get_all_products()]
+
+    def test_detect_format(self):
+        self.assertEqual(detect_format("a.csv"), ("csv", False))
+        self.assertEqual(detect_format("a.ndjson.gz"), ("ndjson", True))
+        self.assertEqual(detect_format("a.jsonl"), ("ndjson", False))
+        with self.assertRaises(ValueError):
+            detect_format("a.txt")
+
+    def test_round_trip(self):
+        for name in ("out.csv", "out.csv.gz", "out.ndjson", "out.ndjson.gz"):
+            self.assertEqual(export_products(self.db, self.path(name), batch_size=2), 3)
+            with Database(self.path(f"copy_{name}.db")) as copy:
+                self.assertEqual(import_products(copy, self.path(name), chunk_size=2), 3)
+                self.assertEqual(self.names(copy), self.names(self.db))
+
+    def test_gzip_output_is_compressed(self):
+        export_products(self.db, self.path("out.ndjson.gz"))
+        with gzip.open(self.path("out.ndjson.gz"), "rt", encoding="utf-8") as f:
+            self.assertEqual(json.loads(f.readline())["product_name"], "Kugelis, su spirgais")
+
+    def test_import_resumes_after_failure(self):
+        source = self.path("broken.ndjson")
+        with open(source, "w", encoding="utf-8") as f:
+            f.write('{"product_name": "A"}\n{"product_name": "B"}\n{"product_name": "C"}\nnot json\n')
+
+        with Database(self.path("target.db")) as target:
+            with self.assertRaises(ValueError):
+                import_products(target, source, chunk_size=2)
+            self.assertEqual(len(target.get_all_products()), 2)  # pirmas paketas įrašytas
+
+            with open(source, "w", encoding="utf-8") as f:
+                f.write('{"product_name": "A"}\n{"product_name": "B"}\n{"product_name": "C"}\n{"product_name": "D"}\n')
+            self.assertEqual(import_products(target, source, chunk_size=2), 4)
+            self.assertEqual(sorted(p["product_name"] for p in target.get_all_products()), ["A", "B", "C", "D"])
+
+            # Baigus progresas išvalomas - pakartotinis importas vėl pradeda nuo pradžios
+            self.assertIsNone(target._connection().execute("SELECT * FROM ImportProgress").fetchone())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import LLM
+from llmBackends import GroqBackend, LocalBackend, OpenAICompatibleBackend, backend_from_env
+from llmStandIn import StandInServer
+from metrics.benchmark_llm import run_benchmarks
+from responseCache import ResponseCache
+
+
+class TestBackends(unittest.TestCase):
+
+    def test_backend_from_env(self):
+        with mock.patch.dict(os.environ, {"LLM_BACKEND": "groq", "API_KEY": "raktas"}):
+            backend = backend_from_env()
+        self.assertIsInstance(backend, GroqBackend)
+        self.assertEqual(backend.headers()["Authorization"], "Bearer raktas")
+
+        env = {"LLM_BACKEND": "openai", "LLM_BASE_URL": "http://x/v1/chat/completions", "LLM_MODEL": "m"}
+        with mock.patch.dict(os.environ, env):
+            backend = backend_from_env()
+        self.assertEqual((backend.url, backend.model), ("http://x/v1/chat/completions", "m"))
+        self.assertNotIn("Authorization", backend.headers())
+
+        with mock.patch.dict(os.environ, {"LLM_BACKEND": "openai", "LLM_BASE_URL": ""}), \
+                self.assertRaises(ValueError):
+            backend_from_env()
+        with mock.patch.dict(os.environ, {"LLM_BACKEND": "kitas"}), self.assertRaises(ValueError):
+            backend_from_env()
+
+    def test_request_uses_backend(self):
+        session = mock.Mock()
+        session.post.return_value = mock.Mock(status_code=200, json=lambda: {"choices": [{"message": {"content": ""}}]})
+        backend = OpenAICompatibleBackend("http://kitas/v1/chat/completions", "mano-modelis", "raktas")
+
+        with mock.patch.object(LLM, "_backend", backend), \
+                mock.patch.object(LLM, "get_session", return_value=session):
+            LLM.call_llama_api("valgiau picą")
+
+        self.assertEqual(session.post.call_args.args[0], "http://kitas/v1/chat/completions")
+        self.assertEqual(session.post.call_args.kwargs["json"]["model"], "mano-modelis")
+        self.assertEqual(session.post.call_args.kwargs["headers"]["Authorization"], "Bearer raktas")
+
+
+class TestStandInServer(unittest.TestCase):
+
+    def setUp(self):
+        self.server = StandInServer(port=0, seed=1).start()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ResponseCache(os.path.join(self.tmp.name, "cache.db"))
+        for name, value in (("_backend", LocalBackend(self.server.url)), ("_response_cache", self.cache)):
+            patcher = mock.patch.object(LLM, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.server.stop()
+        self.cache.close()
+        self.tmp.cleanup()
+
+    def test_recorded_response(self):
+        response = LLM.call_llama_api("valgiau koldūnus su grietine ir pica su saliamiu")
+        self.assertEqual(response, {"text": "- Patiekalas: Koldūnai su grietine\n- Patiekalas: Pica su saliamiu",
+                                    "model": "stand-in"})
+
+    def test_stream_and_batch(self):
+        dishes = []
+        LLM.stream_llama_api("Pusryčiams valgiau košę su uogomis", dishes.append)
+        self.assertEqual(dishes, ["Košė su uogomis"])
+
+        response = LLM.call_llama_api_batch(["Pusryčiams valgiau košę su uogomis", "valgiau cepelinus"])
+        self.assertEqual(json.loads(response["text"]), {"0": ["Košė su uogomis"], "1": ["Cepelinai"]})
+
+    def test_error_injection(self):
+        self.server.error_rate = 1.0
+        with mock.patch.object(LLM.time, "sleep"):
+            response = LLM.call_llama_api("valgiau picą su grybais")
+        self.assertIn("503", response["error"])
+        self.assertEqual(self.server.errors, LLM.MAX_RETRIES + 1)
+
+
+def test_benchmark_llm_report():
+    report = run_benchmarks(concurrency_levels=[1, 2], requests_count=6, latency=0.0)
+    assert set(report["concurrency"]) == {"1", "2"}
+    assert report["concurrency"]["2"]["errors"] == 0
+    assert report["concurrency"]["2"]["requests_per_second"] > 0
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,197 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+import LLM
+from llmBackends import OpenAICompatibleBackend
+from llmResilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, LatencyHistogram
+from rateLimiter import RateLimitTimeout
+from responseCache import cache_key
+
+
+def ok_response(text):
+    return mock.Mock(json=lambda: {"choices": [{"message": {"content": text}}]})
+
+
+class TestLatencyHistogram(unittest.TestCase):
+
+    def test_percentiles(self):
+        histogram = LatencyHistogram(buckets=[0.1, 0.2, 0.5, 1.0])
+        self.assertIsNone(histogram.percentile(0.95))
+        for seconds in [0.05] * 90 + [0.4] * 9 + [3.0]:
+            histogram.observe(seconds)
+
+        self.assertEqual(histogram.percentile(0.5), 0.1)
+        self.assertEqual(histogram.percentile(0.95), 0.5)
+        self.assertEqual(histogram.percentile(1.0), 1.0)
+        snapshot = histogram.snapshot()
+        self.assertEqual(snapshot["count"], 100)
+        self.assertEqual(snapshot["buckets"], [(0.1, 90), (0.5, 9), (float("inf"), 1)])
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def test_opens_and_recovers(self):
+        breaker = CircuitBreaker(window=4, min_requests=4, error_rate=0.5, open_seconds=0.05)
+        for success in (True, False, True):
+            breaker.record(success)
+        self.assertEqual(breaker.state, CLOSED)
+        breaker.record(False)
+        self.assertEqual(breaker.state, OPEN)
+        self.assertFalse(breaker.allow())
+
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow())
+        self.assertEqual(breaker.state, HALF_OPEN)
+        # Tik viena bandomoji užklausa
+        self.assertFalse(breaker.allow())
+        breaker.record(True)
+        self.assertEqual(breaker.state, CLOSED)
+        self.assertEqual(breaker.stats()["requests"], 0)
+
+    def test_failed_probe_reopens(self):
+        breaker = CircuitBreaker(window=2, min_requests=2, open_seconds=0.01)
+        breaker.record(False)
+        breaker.record(False)
+        time.sleep(0.02)
+        self.assertTrue(breaker.allow())
+        breaker.record(False)
+        self.assertEqual(breaker.state, OPEN)
+
+
+class TestResilientCalls(unittest.TestCase):
+
+    def setUp(self):
+        self.primary = OpenAICompatibleBackend("http://pagrindinis", "m")
+        self.fallback = OpenAICompatibleBackend("http://atsarginis", "atsarginis-m")
+        for name, value in (("_backend", self.primary), ("_fallback_backend", None),
+                            ("latency_histogram", LatencyHistogram()), ("HEDGE_MIN_DELAY", 0.05)):
+            patcher = mock.patch.object(LLM, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_open_circuit_fails_fast(self):
+        for _ in range(self.primary.breaker.min_requests):
+            self.primary.breaker.record(False)
+
+        with mock.patch.object(LLM, "post_with_retries") as post:
+            response = LLM.call_llama_api("valgiau picą")
+
+        post.assert_not_called()
+        self.assertIn("nepasiekiamas", response["error"])
+
+    def test_fallback_backend(self):
+        LLM.set_fallback_backend(self.fallback)
+        for _ in range(self.primary.breaker.min_requests):
+            self.primary.breaker.record(False)
+
+        with mock.patch.object(LLM, "post_with_retries", return_value=ok_response("- Patiekalas: Pica")) as post:
+            response = LLM.call_llama_api("valgiau picą")
+
+        self.assertEqual(response, {"text": "- Patiekalas: Pica", "model": "atsarginis-m"})
+        self.assertEqual(post.call_args.args[0], "http://atsarginis")
+        self.assertEqual(post.call_args.args[1]["model"], "atsarginis-m")
+
+    def test_fallback_answer_cached_under_its_model(self):
+        LLM.set_fallback_backend(self.fallback)
+        for _ in range(self.primary.breaker.min_requests):
+            self.primary.breaker.record(False)
+        cache = mock.Mock()
+        cache.get.return_value = None
+
+        with mock.patch.object(LLM, "USE_LOCAL_EXTRACTOR", False), \
+                mock.patch.object(LLM, "get_response_cache", return_value=cache), \
+                mock.patch.object(LLM, "post_with_retries", return_value=ok_response("- Patiekalas: Pica")):
+            LLM.send_query("valgiau picą")
+
+        key = cache.put.call_args.args[0]
+        self.assertEqual(key, cache_key("valgiau picą", "atsarginis-m", LLM.PROMPT_VERSION))
+        self.assertNotEqual(key, cache_key("valgiau picą", "m", LLM.PROMPT_VERSION))
+
+    def test_failures_open_circuit(self):
+        with mock.patch.object(LLM, "post_with_retries", side_effect=LLM.requests.exceptions.ConnectionError):
+            for _ in range(self.primary.breaker.min_requests):
+                LLM.call_llama_api("valgiau picą")
+        self.assertEqual(self.primary.breaker.state, OPEN)
+
+    def test_deadline(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        def hang(*args, **kwargs):
+            release.wait(2)
+            return ok_response("- Patiekalas: Pica")
+
+        start = time.monotonic()
+        with mock.patch.object(LLM, "post_with_retries", side_effect=hang):
+            response = LLM.call_llama_api("valgiau picą", timeout=0.1)
+
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertIn("Klaida jungiantis", response["error"])
+
+    def test_hedged_request_wins(self):
+        for _ in range(LLM.HEDGE_MIN_SAMPLES):
+            LLM.latency_histogram.observe(0.01)
+        release = threading.Event()
+        self.addCleanup(release.set)
+        calls = []
+
+        def slow_then_fast(*args, **kwargs):
+            calls.append(time.monotonic())
+            if len(calls) == 1:
+                release.wait(2)
+                return ok_response("- Patiekalas: Lėta")
+            return ok_response("- Patiekalas: Greita")
+
+        start = time.monotonic()
+        with mock.patch.object(LLM, "post_with_retries", side_effect=slow_then_fast):
+            response = LLM.call_llama_api("valgiau picą")
+
+        self.assertEqual(response, {"text": "- Patiekalas: Greita", "model": "m"})
+        self.assertEqual(len(calls), 2)
+        self.assertGreaterEqual(calls[1] - start, LLM.HEDGE_MIN_DELAY)
+        self.assertLess(time.monotonic() - start, 1)
+
+    def test_queue_wait_does_not_trigger_hedge(self):
+        # Laukimas vykdytojo eilėje nėra serverio vėlavimas - dubliuoti nereikia
+        for _ in range(LLM.HEDGE_MIN_SAMPLES):
+            LLM.latency_histogram.observe(0.01)
+        executor = LLM.ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(executor.shutdown)
+        executor.submit(time.sleep, 0.2)
+
+        with mock.patch.object(LLM, "_hedge_executor", executor), \
+                mock.patch.object(LLM, "post_with_retries", return_value=ok_response("- Patiekalas: Pica")) as post:
+            response = LLM.call_llama_api("valgiau picą")
+
+        self.assertEqual(response, {"text": "- Patiekalas: Pica", "model": "m"})
+        post.assert_called_once()
+
+    def test_rate_limit_timeout_keeps_circuit_closed(self):
+        with mock.patch.object(LLM, "post_with_retries", side_effect=RateLimitTimeout("laukta per ilgai")):
+            for _ in range(self.primary.breaker.min_requests):
+                LLM.call_llama_api("valgiau picą")
+        self.assertEqual(self.primary.breaker.state, CLOSED)
+
+    def test_rate_limited_probe_releases_half_open(self):
+        breaker = self.primary.breaker
+        breaker.open_seconds = 0.01
+        for _ in range(breaker.min_requests):
+            breaker.record(False)
+        time.sleep(0.02)
+
+        with mock.patch.object(LLM, "post_with_retries", side_effect=RateLimitTimeout("laukta per ilgai")):
+            LLM.call_llama_api("valgiau picą")
+        self.assertEqual(breaker.state, HALF_OPEN)
+        self.assertTrue(breaker.allow())
+
+    def test_no_hedge_without_samples(self):
+        with mock.patch.object(LLM, "post_with_retries", return_value=ok_response("- Patiekalas: Pica")) as post:
+            LLM.call_llama_api("valgiau picą")
+        post.assert_called_once()
+        self.assertEqual(LLM.resilience_stats()["latency"]["count"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import sqlite3
+import unittest
+from pathlib import Path
+
+from database.database import Database
+from database.migrations import MIGRATIONS, Migration, migrate
+
+TEST_DB = Path(__file__).parent / 'test_migrations.db'
+
+
+class TestMigrations(unittest.TestCase):
+
+    def setUp(self):
+        if os.path.exists(TEST_DB):
+            os.remove(TEST_DB)
+        self.db = None
+
+    def tearDown(self):
+        if self.db is not None:
+            self.db.close()
+        if os.path.exists(TEST_DB):
+            os.remove(TEST_DB)
+
+    def create_baseline_db(self, rows):
+        # Senoji schema: tik Product lentelė, user_version = 0
+        conn = sqlite3.connect(TEST_DB)
+        conn.execute('''
+        CREATE TABLE Product (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            product_name TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''')
+        conn.executemany('INSERT INTO Product (product_name) VALUES (?)', [(name,) for name in rows])
+        conn.commit()
+        conn.close()
+
+    def test_new_database_at_latest_version(self):
+        self.db = Database(TEST_DB)
+        self.assertEqual(self.db.schema_version(), MIGRATIONS[-1].version)
+
+    def test_existing_database_upgraded(self):
+        self.create_baseline_db(["Cepelinai su kiauliena", "Šaltibarščiai"])
+        self.db = Database(TEST_DB)
+
+        self.assertEqual(self.db.schema_version(), MIGRATIONS[-1].version)
+        indexes = {row[0] for row in self.db._connection().execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index'")}
+        self.assertIn("idx_product_created_at", indexes)
+        self.assertIn("idx_product_name_created_at", indexes)
+        self.assertEqual(len(self.db.search_products("saltibarsciai")), 1)
+        self.assertEqual(len(self.db.get_all_products()), 2)
+        self.assertEqual(self.db.summary_count_by_period('month'), self.db.count_by_period('month'))
+
+    def test_migrate_is_idempotent(self):
+        self.db = Database(TEST_DB)
+        self.db.add_product("Pica")
+        self.db.create_tables()
+        self.assertEqual(len(self.db.search_products("pica")), 1)
+
+    def test_backfill_resumes_after_failure(self):
+        self.create_baseline_db([f"Dish {i}" for i in range(10)])
+        self.db = Database(TEST_DB)
+
+        def create_copy(conn):
+            conn.execute("CREATE TABLE Copy (id INTEGER PRIMARY KEY)")
+            conn.execute("INSERT INTO Copy (id) VALUES (5)")  # sukels klaidą antrame pakete
+
+        migration = Migration(100, create_copy, "INSERT INTO Copy (id) SELECT id FROM Product WHERE id > ? AND id <= ?")
+
+        with self.assertRaises(sqlite3.IntegrityError):
+            migrate(self.db, [migration], batch_size=3)
+        self.assertEqual(self.db.schema_version(), MIGRATIONS[-1].version)
+        copied = self.db._connection().execute("SELECT COUNT(*) FROM Copy").fetchone()[0]
+        self.assertEqual(copied, 4)  # pirmas paketas (1-3) ir id 5
+
+        self.db._connection().execute("DELETE FROM Copy WHERE id = 5")
+        self.db._connection().commit()
+        migrate(self.db, [migration], batch_size=3)
+
+        self.assertEqual(self.db.schema_version(), 100)
+        ids = [row[0] for row in self.db._connection().execute("SELECT id FROM Copy ORDER BY id")]
+        self.assertEqual(ids, list(range(1, 11)))
+
+
+if __name__ == '__main__':
+    unittest.main()
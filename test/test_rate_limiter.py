@@ -0,0 +1,109 @@
+import io
+import threading
+import time
+import unittest
+from unittest import mock
+
+import requests
+
+import LLM
+from rateLimiter import (BACKFILL, INTERACTIVE, RateLimiter, RateLimitTimeout, TokenBucket, estimate_tokens,
+                         parse_duration)
+
+
+def fast_limiter(requests_per_second, burst=1, tokens=None):
+    limiter = RateLimiter(60)
+    limiter.requests = TokenBucket(burst, per_seconds=burst / requests_per_second)
+    if tokens is not None:
+        limiter.tokens = TokenBucket(tokens, per_seconds=1.0)
+    return limiter
+
+
+class TestRateLimiter(unittest.TestCase):
+
+    def test_parse_duration(self):
+        self.assertEqual(parse_duration("7.66s"), 7.66)
+        self.assertAlmostEqual(parse_duration("2m59.56s"), 179.56)
+        self.assertEqual(parse_duration("120ms"), 0.12)
+        self.assertEqual(parse_duration("3"), 3.0)
+        self.assertIsNone(parse_duration(None))
+        self.assertIsNone(parse_duration("greitai"))
+
+    def test_estimate_tokens(self):
+        payload = {"messages": [{"content": "x" * 400}], "max_tokens": 300}
+        self.assertEqual(estimate_tokens(payload), 400)
+
+    def test_requests_are_paced(self):
+        limiter = fast_limiter(requests_per_second=20, burst=2)
+        start = time.monotonic()
+        for _ in range(5):
+            limiter.acquire()
+        # 2 iš karto, likę 3 kas 50 ms
+        self.assertGreaterEqual(time.monotonic() - start, 0.13)
+
+    def test_token_budget(self):
+        limiter = fast_limiter(requests_per_second=1000, burst=100, tokens=100)
+        limiter.acquire(tokens=100)
+        start = time.monotonic()
+        limiter.acquire(tokens=20)
+        self.assertGreaterEqual(time.monotonic() - start, 0.15)
+
+    def test_interactive_before_backfill(self):
+        limiter = fast_limiter(requests_per_second=5)
+        limiter.acquire()
+        order = []
+
+        def worker(name, priority):
+            limiter.acquire(priority=priority)
+            order.append(name)
+
+        backfill = threading.Thread(target=worker, args=("backfill", BACKFILL))
+        interactive = threading.Thread(target=worker, args=("interactive", INTERACTIVE))
+        backfill.start()
+        time.sleep(0.05)
+        interactive.start()
+        backfill.join()
+        interactive.join()
+        self.assertEqual(order, ["interactive", "backfill"])
+
+    def test_headers_pause_when_exhausted(self):
+        limiter = fast_limiter(requests_per_second=1000, burst=100)
+        limiter.update_from_headers({"x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "150ms"})
+        start = time.monotonic()
+        limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.14)
+
+    def test_timeout(self):
+        limiter = fast_limiter(requests_per_second=0.1)
+        limiter.acquire()
+        with self.assertRaises(RateLimitTimeout):
+            limiter.acquire(timeout=0.05)
+        self.assertEqual(limiter._waiting, [])
+
+
+class TestLimitedRequests(unittest.TestCase):
+
+    def test_post_with_retries_uses_limiter(self):
+        limiter = mock.Mock()
+        session = mock.Mock()
+        too_many = requests.Response()
+        too_many.status_code = 429
+        too_many.raw = io.BytesIO()
+        too_many.headers.update({"Retry-After": "1", "x-ratelimit-remaining-tokens": "0"})
+        ok = requests.Response()
+        ok.status_code = 200
+        session.post.side_effect = [too_many, ok]
+        payload = {"messages": [{"content": "x" * 40}], "max_tokens": 10}
+
+        with mock.patch.object(LLM, "get_session", return_value=session), \
+                mock.patch.object(LLM.time, "sleep"):
+            LLM.post_with_retries("http://x", payload, {}, limiter=limiter, priority=BACKFILL)
+
+        limiter.acquire.assert_called_with(20, BACKFILL, timeout=LLM.READ_TIMEOUT)
+        self.assertEqual(limiter.acquire.call_count, 2)
+        limiter.pause.assert_called_once_with(1.0)
+        limiter.update_from_headers.assert_any_call(too_many.headers)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import LLM
+from responseCache import ResponseCache, cache_key, normalize_query
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_file = os.path.join(self.tmp.name, "cache.db")
+        self.cache = ResponseCache(self.db_file, memory_size=2, disk_size=3)
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp.cleanup()
+
+    def test_normalized_key(self):
+        self.assertEqual(normalize_query("  Pusryčiams   valgiau KOŠĘ. "), "pusryčiams valgiau košę")
+        self.assertEqual(cache_key("valgiau košę", "m", 1), cache_key("Valgiau  košę!", "m", 1))
+        self.assertNotEqual(cache_key("valgiau košę", "m", 1), cache_key("valgiau košę", "m", 2))
+        self.assertNotEqual(cache_key("valgiau košę", "m", 1), cache_key("valgiau košę", "kitas", 1))
+
+    def test_memory_and_disk_hits(self):
+        self.assertIsNone(self.cache.get("a"))
+        self.cache.put("a", {"text": "- Patiekalas: Košė"})
+        self.assertEqual(self.cache.get("a"), {"text": "- Patiekalas: Košė"})
+
+        # Naujas procesas: atmintis tuščia, atsakymas paimamas iš SQLite
+        reopened = ResponseCache(self.db_file)
+        self.assertEqual(reopened.get("a"), {"text": "- Patiekalas: Košė"})
+        self.assertEqual(reopened.get("a"), {"text": "- Patiekalas: Košė"})
+        self.assertEqual(reopened.stats()["disk_hits"], 1)
+        self.assertEqual(reopened.stats()["memory_hits"], 1)
+        reopened.close()
+
+        stats = self.cache.stats()
+        self.assertEqual((stats["memory_hits"], stats["misses"]), (1, 1))
+        self.assertEqual(stats["hit_rate"], 0.5)
+
+    def test_memory_lru_eviction(self):
+        for key in ("a", "b", "c"):
+            self.cache.put(key, {"text": key})
+        self.assertEqual(self.cache.stats()["memory_size"], 2)
+        self.assertEqual(self.cache.get("a"), {"text": "a"})
+        self.assertEqual(self.cache.stats()["disk_hits"], 1)
+
+    def test_disk_size_bound(self):
+        for i, key in enumerate("abcde"):
+            with mock.patch("responseCache.time.time", return_value=1000.0 + i):
+                self.cache.put(key, {"text": key})
+        rows = self.cache._connection().execute("SELECT key FROM ResponseCache ORDER BY key").fetchall()
+        self.assertEqual([row[0] for row in rows], ["c", "d", "e"])
+
+    def test_ttl_expiry(self):
+        self.cache.put("a", {"text": "a"})
+        with mock.patch("responseCache.time.time", return_value=time.time() + self.cache.ttl + 1):
+            self.assertIsNone(self.cache.get("a"))
+
+
+class TestSendQueryCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ResponseCache(os.path.join(self.tmp.name, "cache.db"))
+        patcher = mock.patch.object(LLM, "_response_cache", self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp.cleanup()
+
+    def test_repeated_query_uses_cache(self):
+        with mock.patch.object(LLM, "call_llama_api", return_value={"text": "- Patiekalas: Košė"}) as call:
+            first = LLM.send_query("Pusryčiams valgiau košę su uogomis")
+            second = LLM.send_query("pusryčiams  valgiau košę su uogomis.")
+
+        self.assertEqual(first, second)
+        self.assertIn("Košė", first)
+        call.assert_called_once()
+
+    def test_errors_not_cached(self):
+        with mock.patch.object(LLM, "call_llama_api", return_value={"error": "Klaida jungiantis"}) as call:
+            LLM.send_query("valgiau picą su grybais")
+            LLM.send_query("valgiau picą su grybais")
+        self.assertEqual(call.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime
+
+from database.database import Database
+
+
+class TestSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.db = Database(os.path.join(self.tmp, "data.db"))
+        self.db.add_products([("Kugelis", "2022-03-01 12:00:00"), ("Pica", "2024-02-01 12:00:00")])
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmp)
+
+    def test_snapshot_is_point_in_time(self):
+        for copy in (False, True):
+            with self.db.snapshot(copy=copy) as snap:
+                before = snap.get_all_products()
+                # Rašymas neblokuojamas ir snapshot jo nemato
+                self.db.add_product("Sriuba")
+                self.assertEqual(snap.get_all_products(), before)
+                self.assertEqual(snap.dish_frequency(), [("Kugelis", 1), ("Pica", 1)])
+            self.db.delete_all_products()
+            self.db.add_products([("Kugelis", "2022-03-01 12:00:00"), ("Pica", "2024-02-01 12:00:00")])
+
+    def test_snapshot_after_connections_closed(self):
+        self.db.close()
+        with self.db.snapshot() as snap:
+            self.assertEqual(len(snap.get_all_products()), 2)
+
+    def test_snapshot_is_read_only(self):
+        with self.db.snapshot() as snap:
+            with self.assertRaises(sqlite3.OperationalError):
+                snap.add_product("Sriuba")
+            with self.assertRaises(sqlite3.OperationalError):
+                snap.delete_all_products()
+        self.assertEqual(len(self.db.get_all_products()), 2)
+
+    def test_snapshot_includes_archives(self):
+        self.db.archive_older_than(datetime(2023, 1, 1))
+        with self.db.snapshot() as snap:
+            self.db.delete_all_products()
+            self.assertEqual([p["product_name"] for p in snap.get_all_products()], ["Pica", "Kugelis"])
+        self.assertEqual(self.db.get_all_products(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -11,10 +11,9 @@ def db():
     if os.path.exists(TEST_DB_FILE):
         os.remove(TEST_DB_FILE)
 
-    test_db = Database()
-    test_db.db_file = TEST_DB_FILE
-    test_db.create_tables()
-    return test_db
+    test_db = Database(TEST_DB_FILE)
+    yield test_db
+    test_db.close()
 
 # ✅ TA-01 – Patikriname, ar duomenys matomi, jei bent vienas įrašas egzistuoja
 def test_products_shown_in_ui(db):
@@ -46,7 +45,7 @@ def test_no_data_message(db):
 
 # ✅ TA-05 – Patikriname klaidos valdymą (simuliuojam DB klaidą)
 def test_database_error_handling(monkeypatch):
-    broken_db = Database()
+    broken_db = Database(TEST_DB_FILE)
 
     # Apgauname get_all_products, kad mestų klaidą
     def fake_error():
@@ -58,3 +57,4 @@ def test_database_error_handling(monkeypatch):
         broken_db.get_all_products()
 
     assert "DB nepavyko" in str(exc.value)
+    broken_db.close()
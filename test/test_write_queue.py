@@ -0,0 +1,66 @@
+import os
+import threading
+import unittest
+from pathlib import Path
+
+from database.database import Database
+from database.write_queue import WriteQueue
+
+TEST_DB = Path(__file__).parent / 'test_write_queue.db'
+
+
+class TestWriteQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.db = Database(TEST_DB)
+        self.writer = WriteQueue(self.db)
+
+    def tearDown(self):
+        self.writer.close()
+        self.db.close()
+        if os.path.exists(TEST_DB):
+            os.remove(TEST_DB)
+
+    def test_submit_returns_result(self):
+        ids = self.writer.submit("add_products", ["Apple", "Banana"]).result(timeout=5)
+        self.assertEqual(len(ids), 2)
+        self.assertEqual(len(self.db.get_all_products()), 2)
+
+    def test_operations_applied_in_order(self):
+        self.writer.submit("add_product", "Apple")
+        self.writer.flush(timeout=5)
+        product_id = self.db.get_all_products()[0]['id']
+        self.writer.submit("update_product", product_id, "Pear")
+        self.writer.submit("delete_product", product_id)
+        self.writer.flush(timeout=5)
+        self.assertEqual(self.db.get_all_products(), [])
+
+    def test_failed_operation_does_not_abort_batch(self):
+        bad = self.writer.submit("add_product", None)  # product_name NOT NULL
+        good = self.writer.submit("add_product", "Apple")
+        with self.assertRaises(Exception):
+            bad.result(timeout=5)
+        good.result(timeout=5)
+        self.assertEqual([p['product_name'] for p in self.db.get_all_products()], ["Apple"])
+
+    def test_callback_goes_through_dispatch(self):
+        dispatched = []
+        done = threading.Event()
+
+        def dispatch(fn):
+            dispatched.append(fn)
+            done.set()
+
+        writer = WriteQueue(self.db, dispatch=dispatch)
+        writer.submit("add_product", "Apple", callback=lambda future: None)
+        self.assertTrue(done.wait(timeout=5))
+        writer.close()
+        self.assertEqual(len(dispatched), 1)
+
+    def test_unknown_operation(self):
+        with self.assertRaises(ValueError):
+            self.writer.submit("get_all_products")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -22,6 +22,8 @@ TRANSLATIONS = {
         'filter_month': "This Month",
         'apply_changes': "Apply Changes",
         'recognized_products': "Recognized Products",
+        'load_more': "Load more",
+        'search_hint': "Search dishes",
     },
     'lt': {
         'start_recording': "Pradėti įrašymą",
@@ -46,5 +48,7 @@ TRANSLATIONS = {
         'filter_month': "Mėnuo",
         'apply_changes': "Įrašyti pakeitimus",
         'recognized_products': "Atpažinti produktai",
+        'load_more': "Rodyti daugiau",
+        'search_hint': "Ieškoti patiekalo",
     }
 }
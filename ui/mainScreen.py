@@ -1,3 +1,6 @@
+import threading
+from functools import partial
+
 from kivy.app import App
 from kivy.lang import Builder
 from kivy.uix.boxlayout import BoxLayout
@@ -8,23 +11,33 @@ from kivy.uix.button import Button
 from kivy.uix.textinput import TextInput
 
 from ui.statisticsScreen import StatisticsScreen
-from database.database import Database
-from LLM import send_query
+from ui.storage import db, writer
+from dishCanonicalizer import DishCanonicalizer
+from LLM import stream_query
+from dishParser import Dish, parse_dishes
 from voiceToText import VoiceToText
 from kivy.clock import Clock
 
 from TranslationManager import translationManager
 
 PRODUCTS = []
-db = Database()
+# Atpažinti pavadinimai suvienodinami su jau išsaugotais ("kiaulienos" -> "kiauliena")
+canonicalizer = DishCanonicalizer()
 Builder.load_file("UI.kv")
 
 
+def load_canonicalizer():
+    # Kraunama fone, kad nestabdytų paleidimo; kol indeksas nepilnas, pavadinimai tiesiog mažiau suvienodinami
+    canonicalizer.add_all(name for name, _ in db.dish_frequency())
+
+
 class MainScreen(Screen):
     def __init__(self, **kwargs):
         super(MainScreen, self).__init__(**kwargs)
         self.voice_to_text = VoiceToText()
         self.translator = translationManager('lt')  # Default language
+        self._saving = False
+        self._streaming = False
 
     def start_recording(self):
         if not self.voice_to_text.is_recording:
@@ -76,32 +89,62 @@ class MainScreen(Screen):
         self.ids.transcription.text = ""
 
     def send_to_llm(self):
+        # Vienu metu tik vienas srautas, kitaip dvi gijos pildytų PRODUCTS kartu
+        if self._streaming:
+            return
+        self._streaming = True
         query = self.ids.transcription.text
         self.clear_text()
-        result = send_query(query)
-        self.display_results(result)
-
-    def display_results(self, result):
-        self.ids.transcription.text = result
-        self.save_to_products(result)
+        PRODUCTS.clear()
         self.update_product_list()
+        # Atsakymas skaitomas srautu kitoje gijoje; kiekvienas patiekalas rodomas vos tik atpažintas
+        threading.Thread(target=self._stream_llm, args=(query,), daemon=True).start()
+
+    def _stream_llm(self, query):
+        def on_dish(name):
+            name = canonicalizer.canonicalize(name)
+            Clock.schedule_once(lambda dt: self.add_product(name))
+
+        try:
+            result = stream_query(query, on_dish)
+        except Exception as e:
+            result = f"Klaida: {e}"
+        Clock.schedule_once(lambda dt: self._on_stream_done(result))
+
+    def _on_stream_done(self, result):
+        self._streaming = False
+        self.ids.transcription.text = result
 
-    def save_to_products(self, result):
-        PRODUCTS.clear()
-        lines = result.split("\n")
-        for idx, line in enumerate(lines, 1):
-            if line.strip().startswith("- Patiekalas:"):
-                name = line.split(":", 1)[1].strip()
-                PRODUCTS.append({"id": idx, "product_name": name})
+    def add_product(self, name):
+        product = Dish(max((p.id for p in PRODUCTS), default=0) + 1, name)
+        PRODUCTS.append(product)
+        self.add_product_row(product)
 
     def save_to_database(self):
-        if not PRODUCTS:
+        # Antras paspaudimas, kol ankstesnis įrašymas nebaigtas, ignoruojamas - kitaip būtų dublikatų
+        if not PRODUCTS or self._saving:
             return
-        for product in PRODUCTS:
-            db.add_product(product["product_name"])
-        self.ids.transcription.text = ""
-        PRODUCTS.clear()
+        self._saving = True
+        products = list(PRODUCTS)
+        writer.submit("add_products", [product.name for product in products],
+                      callback=partial(self._on_products_saved, products, self.ids.transcription.text))
+
+    def _on_products_saved(self, products, transcription, future):
+        self._saving = False
+        if future.exception() is not None:
+            # Sąrašas paliekamas, kad būtų galima bandyti dar kartą
+            self.show_error("Nepavyko išsaugoti produktų. Bandykite dar kartą.")
+            print(f"Klaida rašant į DB: {future.exception()}")
+            return
+
+        # Išvalomi tik įrašyti produktai ir tekstas, jei per tą laiką nepradėtas naujas atpažinimas
+        saved = {id(product) for product in products}
+        PRODUCTS[:] = [product for product in PRODUCTS if id(product) not in saved]
+        if self.ids.transcription.text == transcription:
+            self.ids.transcription.text = ""
         self.update_product_list()
+        for product in products:
+            canonicalizer.add(product.name)
 
         layout = BoxLayout(orientation='vertical', spacing=10, padding=10)
         layout.add_widget(Label(text=self.translator.t("product_saved")))
@@ -112,35 +155,37 @@ class MainScreen(Screen):
         popup.open()
 
     def update_product_list(self):
-        product_list = self.ids.product_list
-        product_list.clear_widgets()
+        self.ids.product_list.clear_widgets()
         for product in PRODUCTS:
-            row = BoxLayout(orientation='horizontal', size_hint_y=None, height=40)
-
-            edit_btn = Button(
-                text=product["product_name"],
-                size_hint_y=None,
-                height=40,
-                on_press=lambda btn, pid=product["id"]: self.edit_product(pid)
-            )
-            del_btn = Button(
-                text=self.translator.t("delete"),
-                size_hint_x=None,
-                width=100,
-                height=40,
-                on_press=lambda btn, pid=product["id"]: self.confirm_delete(pid)
-            )
-            row.add_widget(edit_btn)
-            row.add_widget(del_btn)
-            product_list.add_widget(row)
+            self.add_product_row(product)
+
+    def add_product_row(self, product):
+        row = BoxLayout(orientation='horizontal', size_hint_y=None, height=40)
+
+        edit_btn = Button(
+            text=product.name,
+            size_hint_y=None,
+            height=40,
+            on_press=lambda btn, pid=product.id: self.edit_product(pid)
+        )
+        del_btn = Button(
+            text=self.translator.t("delete"),
+            size_hint_x=None,
+            width=100,
+            height=40,
+            on_press=lambda btn, pid=product.id: self.confirm_delete(pid)
+        )
+        row.add_widget(edit_btn)
+        row.add_widget(del_btn)
+        self.ids.product_list.add_widget(row)
 
     def edit_product(self, product_id):
-        product = next((p for p in PRODUCTS if p["id"] == product_id), None)
+        product = next((p for p in PRODUCTS if p.id == product_id), None)
         if not product:
             return
 
         self.product_input = TextInput(
-            text=product["product_name"],
+            text=product.name,
             size_hint_y=None,
             height=40
         )
@@ -184,14 +229,14 @@ class MainScreen(Screen):
             self.show_error("Pavadinimas negali viršyti 255 simbolių.")
             return
         for product in PRODUCTS:
-            if product["id"] == product_id:
-                product["product_name"] = new_name
+            if product.id == product_id:
+                product.name = new_name
         popup.dismiss()
         self.update_product_list()
 
     def confirm_delete(self, product_id):
-        product = next((p for p in PRODUCTS if p["id"] == product_id), None)
-        name = product["product_name"]
+        product = next((p for p in PRODUCTS if p.id == product_id), None)
+        name = product.name
 
         layout = BoxLayout(orientation='vertical', spacing=10, padding=10)
         layout.add_widget(Label(text=f"Ar tikrai norite ištrinti {name}?"))
@@ -212,7 +257,7 @@ class MainScreen(Screen):
     def delete_product(self, product_id, name, popup):
         popup.dismiss()
         global PRODUCTS
-        PRODUCTS = [p for p in PRODUCTS if p["id"] != product_id]
+        PRODUCTS = [p for p in PRODUCTS if p.id != product_id]
         self.update_product_list()
 
         layout = BoxLayout(orientation='vertical', spacing=10, padding=10)
@@ -225,16 +270,10 @@ class MainScreen(Screen):
         popup.open()
 
     def update_from_text(self):
-        global PRODUCTS
-        PRODUCTS.clear()
-        self.ids.product_list.clear_widgets()
-        lines = self.ids.transcription.text.strip().split("\n")
-        id_counter = 1
-        for line in lines:
-            if line.strip().startswith("- Patiekalas:"):
-                name = line.split(":", 1)[1].strip()
-                PRODUCTS.append({"id": id_counter, "product_name": name})
-                id_counter += 1
+        # Pavadinimai suvienodinami kaip ir gauti srautu, kitaip "Apply changes" juos grąžintų į neapdorotus
+        PRODUCTS[:] = parse_dishes(self.ids.transcription.text)
+        for product in PRODUCTS:
+            product.name = canonicalizer.canonicalize(product.name)
         self.update_product_list()
 
     def show_error(self, message):
@@ -257,8 +296,14 @@ class MyApp(App):
         sm = ScreenManager()
         sm.add_widget(MainScreen(name="main"))
         sm.add_widget(StatisticsScreen(name="statistics"))
+        threading.Thread(target=load_canonicalizer, name="dish-index", daemon=True).start()
         return sm
 
+    def on_stop(self):
+        # Daemon rašymo gija užsidarant programai nutrūktų - pirmiau įrašoma visa eilė
+        writer.close()
+        db.close()
+
 
 if __name__ == "__main__":
     MyApp().run()
@@ -5,15 +5,15 @@ from kivy.uix.button import Button
 from kivy.uix.textinput import TextInput
 from kivy.uix.screenmanager import Screen
 from kivy.app import App 
-from database.database import Database
+from database.database import PAGE_SIZE
 from TranslationManager import translationManager
-
-db = Database()
+from ui.storage import db, writer
 
 class StatisticsScreen(Screen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.translator = translationManager('lt')
+        self.load_more_button = None
 
     def set_language(self, language):
         lang_code = 'lt' if language == 'Lithuanian' else 'en'
@@ -32,6 +32,9 @@ class StatisticsScreen(Screen):
         if current_selection not in self.ids.spinner.values:
             self.ids.spinner.text = self.translator.t("filter_all")
 
+        if "search_input" in self.ids:
+            self.ids.search_input.hint_text = self.translator.t("search_hint")
+
         # 🆙 Update back button
         if "back_button" in self.ids:
             self.ids.back_button.text = self.translator.t("go_back")
@@ -49,10 +52,13 @@ class StatisticsScreen(Screen):
     def load_statistics_data(self, filter_type):
         stats_list = self.ids.stats_list
         stats_list.clear_widgets()
+        self.load_more_button = None
 
         try:
             if filter_type == 'Visi':
-                products = db.get_all_products()
+                # Visa istorija kraunama puslapiais
+                self.load_next_page()
+                return
             elif filter_type == 'Diena':
                 products = db.get_products_today()
             elif filter_type == 'Savaitė':
@@ -71,28 +77,60 @@ class StatisticsScreen(Screen):
                 return
 
             for product in products:
-                row = BoxLayout(size_hint_y=None, height=40, spacing=10)
-
-                product_button = Button(
-                    text=product['product_name'],
-                    on_press=lambda btn, p=product: self.edit_product(p)
-                )
-
-                delete_button = Button(
-                    text=self.translator.t("delete"),
-                    size_hint_x=None,
-                    width=100,
-                    on_press=lambda btn, p_id=product['id']: self.confirm_delete_popup(p_id)
-                )
-
-                row.add_widget(product_button)
-                row.add_widget(delete_button)
-                stats_list.add_widget(row)
+                self.add_product_row(product)
 
         except Exception as e:
             self.show_error("Nepavyko užkrauti duomenų. Bandykite dar kartą.")
             print(f"Klaida įkeliant statistiką: {e}")
 
+    def load_next_page(self, last_product=None):
+        stats_list = self.ids.stats_list
+        # Nepavykus mygtukas paliekamas, kad būtų galima bandyti dar kartą
+        try:
+            if last_product is None:
+                products = db.get_products_page(limit=PAGE_SIZE)
+            else:
+                products = db.get_products_page(last_product['created_at'], last_product['id'], limit=PAGE_SIZE)
+        except Exception as e:
+            self.show_error("Nepavyko užkrauti duomenų. Bandykite dar kartą.")
+            print(f"Klaida įkeliant puslapį: {e}")
+            return
+
+        if self.load_more_button is not None:
+            stats_list.remove_widget(self.load_more_button)
+            self.load_more_button = None
+
+        for product in products:
+            self.add_product_row(product)
+
+        if len(products) == PAGE_SIZE:
+            self.load_more_button = Button(
+                text=self.translator.t("load_more"),
+                size_hint_y=None,
+                height=40,
+                on_press=lambda btn, p=products[-1]: self.load_next_page(p)
+            )
+            stats_list.add_widget(self.load_more_button)
+
+    def add_product_row(self, product):
+        row = BoxLayout(size_hint_y=None, height=40, spacing=10)
+
+        product_button = Button(
+            text=product['product_name'],
+            on_press=lambda btn, p=product: self.edit_product(p)
+        )
+
+        delete_button = Button(
+            text=self.translator.t("delete"),
+            size_hint_x=None,
+            width=100,
+            on_press=lambda btn, p_id=product['id']: self.confirm_delete_popup(p_id)
+        )
+
+        row.add_widget(product_button)
+        row.add_widget(delete_button)
+        self.ids.stats_list.add_widget(row)
+
     def show_error(self, message):
         content = BoxLayout(orientation="vertical", padding=10, spacing=10)
         label = Label(text=message)
@@ -141,10 +179,17 @@ class StatisticsScreen(Screen):
         popup.open()
 
     def _delete_and_close(self, product_id, popup):
-        db.delete_product(product_id)
         popup.dismiss()
+        writer.submit("delete_product", product_id,
+                      callback=lambda future: self._on_write_done(future, "deleted"))
+
+    def _on_write_done(self, future, message_key):
+        if future.exception() is not None:
+            self.show_error("Nepavyko išsaugoti pakeitimų. Bandykite dar kartą.")
+            print(f"Klaida rašant į DB: {future.exception()}")
+            return
         self.set_filter(self.ids.spinner.text)
-        self.show_confirmation(self.translator.t("deleted"))
+        self.show_confirmation(self.translator.t(message_key))
 
     def edit_product(self, product):
         content = BoxLayout(orientation="vertical", spacing=10, padding=10)
@@ -161,10 +206,9 @@ class StatisticsScreen(Screen):
                 self.show_error("Pavadinimas negali viršyti 255 simbolių.")
                 return
 
-            db.update_product(product['id'], new_name)
-            self.set_filter(self.ids.spinner.text)
             popup.dismiss()
-            self.show_confirmation(self.translator.t("edited"))
+            writer.submit("update_product", product['id'], new_name,
+                          callback=lambda future: self._on_write_done(future, "edited"))
 
         def cancel(_):
             popup.dismiss()
@@ -195,5 +239,21 @@ class StatisticsScreen(Screen):
         self.load_statistics_data(internal_value)
 
 
+    def search(self, text):
+        if not text.strip():
+            self.set_filter(self.ids.spinner.text)
+            return
+
+        stats_list = self.ids.stats_list
+        stats_list.clear_widgets()
+        self.load_more_button = None
+
+        try:
+            for product in db.search_products(text, limit=PAGE_SIZE):
+                self.add_product_row(product)
+        except Exception as e:
+            self.show_error("Nepavyko užkrauti duomenų. Bandykite dar kartą.")
+            print(f"Klaida ieškant produktų: {e}")
+
     def go_back(self):
         self.manager.current = "main"
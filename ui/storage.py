@@ -0,0 +1,9 @@
+from kivy.clock import Clock
+
+from database.database import Database
+from database.write_queue import WriteQueue
+
+# Bendri visiems ekranams: viena DB ir viena rašymo gija
+db = Database()
+# Rašymai vyksta atskiroje gijoje, callback grąžinami į Kivy giją per Clock
+writer = WriteQueue(db, dispatch=lambda fn: Clock.schedule_once(lambda dt: fn()))
@@ -8,6 +8,8 @@ import time
 import os
 from dotenv import load_dotenv
 
+from rateLimiter import INTERACTIVE, get_limiter, parse_duration
+
 load_dotenv()
 
 API_KEY = os.getenv("API_KEY")
@@ -123,7 +125,10 @@ class VoiceToText:
             return True
 
     def _run_transcription(self):
+        # Bendras visiems transkripcijos kvietimams užklausų biudžetas
+        limiter = get_limiter("transcription")
         try:
+            limiter.acquire(priority=INTERACTIVE)
             with open(self.audio_file_path, "rb") as audio_file:
                 transcription = self.client.audio.transcriptions.create(
                     file=(self.audio_file_path, audio_file.read()),
@@ -141,6 +146,11 @@ class VoiceToText:
                     raise TypeError(f"Netikėta klaida: {type(transcription)}")
 
         except Exception as e:
+            # groq.RateLimitError (429) turi HTTP atsakymą: jo antraštės sustabdo ir kitus kvietimus
+            response = getattr(e, "response", None)
+            if response is not None and getattr(response, "status_code", None) == 429:
+                limiter.update_from_headers(response.headers)
+                limiter.pause(parse_duration(response.headers.get("retry-after")) or 1.0)
             return f"Klaida transkribuojant: {e}"
         # OPS-27 + OPS-23 - Augustas Česnavičius
     def set_language(self, language):